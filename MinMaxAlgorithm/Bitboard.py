@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+"""
+# Bitboard game state for small "get N in a row" games like Tic-Tac-Toe.
+#
+# The tokens of each player are the set bits of one int, bit n is square n.
+# Making or taking back a move is a single XOR, the free squares are the bits
+# set in neither int, and a win is a pattern of bits that is all set.
+# That is much cheaper per node than moving python objects around on a board.
+#
+# Usage:
+#
+#   state = BitboardState()                 # Tic-Tac-Toe by default
+#   algo = GameAlgo.fromBitboardState(state)
+#   move = algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, True, 9)
+#
+#   Other games are given by number of squares and the win patterns as ints.
+#
+#   Or search on the position as one int, with no callback per move:
+#
+#   result = algo.minimaxBitboard(state.packed(), 9, True)
+#   move = state.squareOfMove(result.bestMove)
+#
+"""
+
+TICTACTOE_SQUARES = 9
+
+# Squares are numbered 0 1 2 / 3 4 5 / 6 7 8
+TICTACTOE_WIN_PATTERNS = (0b000000111, 0b000111000, 0b111000000,
+                          0b001001001, 0b010010010, 0b100100100,
+                          0b100010001, 0b001010100)
+
+class BitboardState:
+
+    """
+    squares - Number of squares on the board. Moves are square numbers 0..squares-1.
+    winPatterns - One int per way to win, with the bits of the squares that must be taken.
+    winEval - Eval of a won game. Maximizer win is winEval and minimizer win is -winEval.
+    """
+
+    __slots__ = ('squares', 'fullMask', 'winPatterns', 'winEval',
+                 'maximizerBoard', 'minimizerBoard')
+
+    def __init__(self, squares=TICTACTOE_SQUARES, winPatterns=TICTACTOE_WIN_PATTERNS, winEval=100):
+        self.squares = squares
+        self.fullMask = (1 << squares) - 1
+        self.winPatterns = winPatterns
+        self.winEval = winEval
+        self.maximizerBoard = 0
+        self.minimizerBoard = 0
+
+    def evaluate(self):
+        maximizerBoard = self.maximizerBoard
+        minimizerBoard = self.minimizerBoard
+        for pattern in self.winPatterns:
+            if maximizerBoard & pattern == pattern:
+                return self.winEval
+            if minimizerBoard & pattern == pattern:
+                return -self.winEval
+        return 0
+
+    # Setting and clearing a bit are both XOR, so undo is the same as move.
+    def maximizerMove(self, move):
+        self.maximizerBoard ^= 1 << move
+
+    def minimizerMove(self, move):
+        self.minimizerBoard ^= 1 << move
+
+    maximizerUndoMove = maximizerMove
+    minimizerUndoMove = minimizerMove
+
+    def possibleMoves(self):
+        moves = []
+        self.writePossibleMoves(moves)
+        return moves
+
+    def writePossibleMoves(self, moveBuffer):
+        # No moves when the game is won
+        if self.evaluate() != 0:
+            return 0
+        empty = ~(self.maximizerBoard | self.minimizerBoard) & self.fullMask
+        count = 0
+        while empty:
+            lowestBit = empty & -empty
+            move = lowestBit.bit_length() - 1
+            if count < len(moveBuffer):
+                moveBuffer[count] = move
+            else:
+                moveBuffer.append(move)
+            count += 1
+            empty ^= lowestBit
+        return count
+
+    def hash(self):
+        # Both boards side by side is a unique key for the position.
+        return self.maximizerBoard | (self.minimizerBoard << self.squares)
+
+    # The position packed as one int, for GameAlgo.minimaxBitboard: maximizer's
+    # board in the low bits and minimizer's board above it, as in hash.
+    # A move is the bit of its square in the board of the player making it.
+    def packed(self):
+        return self.hash()
+
+    def packedEvaluate(self, board):
+        maximizerBoard = board & self.fullMask
+        minimizerBoard = board >> self.squares
+        for pattern in self.winPatterns:
+            if maximizerBoard & pattern == pattern:
+                return self.winEval
+            if minimizerBoard & pattern == pattern:
+                return -self.winEval
+        return 0
+
+    def packedMoves(self, board, maximizingPlayer):
+        # No moves when the game is won
+        if self.packedEvaluate(board) != 0:
+            return []
+        empty = ~(board | (board >> self.squares)) & self.fullMask
+        shift = 0 if maximizingPlayer else self.squares
+        moves = []
+        while empty:
+            lowestBit = empty & -empty
+            moves.append(lowestBit << shift)
+            empty ^= lowestBit
+        return moves
+
+    def squareOfMove(self, move):
+        # Square number of a move given by minimaxBitboard
+        if move is None:
+            return None
+        return (move.bit_length() - 1) % self.squares
@@ -27,6 +27,15 @@
 
 """
 import logging
+import multiprocessing
+import os
+import sys
+import threading
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
 #logging.basicConfig(level=logging.DEBUG, format='%(asctime)s %(levelname)s=> %(message)s')
 #logging.basicConfig(filename="MinMaxLog.txt",filemode='w+',level=logging.DEBUG, format='%(levelname)s=> %(message)s')
 logging.basicConfig(level=logging.INFO, format='%(levelname)s=> %(message)s')
@@ -51,6 +60,114 @@ KEY_EVAL = "MinMaxAlgo_keyEval"
 KEY_BESTMOVE = "MinMaxAlgo_keyBestMove"
 KEY_HISTORY = "MinMaxAlgo_keyHistory"
 
+# What the searches return. The KEY_ constants above are the keys of the
+# dict returned by calculateMoveWithHistory.
+Result = namedtuple('Result', 'eval bestMove')
+ResultH = namedtuple('ResultH', 'eval bestMove history')
+
+# Kind of value stored in the transposition table
+TT_EXACT = 0
+TT_LOWERBOUND = 1
+TT_UPPERBOUND = 2
+
+# Index of the fields in a transposition table entry
+TT_KEY = 0
+TT_DEPTH = 1
+TT_FLAG = 2
+TT_EVAL = 3
+TT_BESTMOVE = 4
+TT_GENERATION = 5
+
+# The player given to the callbacks of GameAlgo.fromSideCallbacks
+MAXIMIZER_SIDE = 1
+MINIMIZER_SIDE = -1
+
+# XOR:ed into the position hash when it is minimizers turn, so the same
+# position with different player to move does not share an entry.
+ZOBRIST_MINIMIZER_KEY = 0x9E3779B97F4A7C15
+
+# With preferFasterWin, an eval found "ply" moves from the root counts as
+# eval * FASTER_WIN_DISCOUNT ** ply. It keeps the sign and stays inside
+# minEval..maxEval, but a quicker win is worth more and a later loss less.
+FASTER_WIN_DISCOUNT = 0.99
+
+# Marks that there are no more moves to try in a node
+_NO_MOVE = object()
+
+# Null-move pruning is only tried this deep or deeper. Closer to the bottom
+# the reduced search would be too shallow to say anything.
+NULL_MOVE_MIN_DEPTH = 3
+
+# Searches deeper than this are run on a thread of their own, with a C stack
+# of DEEP_SEARCH_STACK_SIZE bytes and a recursion limit raised by
+# DEEP_SEARCH_FRAMES_PER_PLY for every ply. The recursive searches use a
+# python call per ply, and the callbacks may need some more.
+# The stack size and the recursion limit are set for the whole process while
+# such a search runs, so it is not thread-safe: run one deep search at a time.
+DEEP_SEARCH_DEPTH = 200
+DEEP_SEARCH_STACK_SIZE = 256 * 1024 * 1024
+DEEP_SEARCH_FRAMES_PER_PLY = 4
+_DEEP_SEARCH_THREAD_NAME = "MinMaxAlgo deep search"
+
+# How often, in seconds, a worker process of calculateMoveParallel looks
+# for an interruptAnalyze of the GameAlgo that started it.
+WORKER_INTERRUPT_POLL = 0.01
+
+class TranspositionTable:
+
+    """
+    Remembers already searched positions so that a position reached by another
+    move order (a transposition) does not have to be searched again. It is kept
+    from one move to the next, since the next search will meet many of the
+    same positions again.
+    Positions are found by their 64-bit (Zobrist) hash. The slots are grouped
+    in buckets of two, and the number of buckets is a power of two so the
+    bucket for a key is found by masking it. The first slot in a bucket keeps
+    the deepest entry of the current search, the second always takes the
+    newest entry. That way the costly deep entries are not thrown out by the
+    many shallow ones.
+    """
+
+    __slots__ = ('size', 'mask', 'slots', 'generation')
+
+    # Any eval may be stored, also the floats of preferFasterWin
+    storesFloatEvals = True
+
+    def __init__(self, size):
+        buckets = 1 << max(size // 2 - 1, 0).bit_length()
+        self.size = 2 * buckets
+        self.mask = buckets - 1
+        self.slots = [None] * self.size
+        self.generation = 0
+
+    def newSearch(self):
+        # Deep entries from earlier searches may be replaced from now on.
+        self.generation += 1
+
+    def probe(self, key):
+        index = (key & self.mask) << 1
+        entry = self.slots[index]
+        if entry is not None and entry[TT_KEY] == key:
+            return entry
+        entry = self.slots[index + 1]
+        if entry is not None and entry[TT_KEY] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, flag, evaluation, bestMove):
+        index = (key & self.mask) << 1
+        newEntry = (key, depth, flag, evaluation, bestMove, self.generation)
+        deepEntry = self.slots[index]
+        if (deepEntry is None or deepEntry[TT_KEY] == key or depth >= deepEntry[TT_DEPTH]
+                or deepEntry[TT_GENERATION] != self.generation):
+            self.slots[index] = newEntry
+        else:
+            self.slots[index + 1] = newEntry
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.generation = 0
+
 class GameAlgo:
 
     """
@@ -67,9 +184,102 @@ class GameAlgo:
     minimizerUndoMoveFunc_callback - " (but for minimizer player)
     getListOfPossibleMovesAsMaximizer_callback - Return a list with currently all possible moves for maximizer player.
     getListOfPossibleMovesAsMinimizer_callback - As above but for mimimizer player.
+    zobristHash_callback - Optional. Return a 64-bit hash of the current position, typically
+                           a Zobrist hash (XOR of a random number per piece and square) that
+                           the move and undo callbacks keep updated. When given, the alpha-beta
+                           search uses a transposition table with transpositionTableSize slots.
+                           The table is kept between calls to calculateMove. Call newGame to clear it.
+                           Without zobristHash_callback no table is made.
+    transpositionTable - Optional. Table to use instead of a TranspositionTable, e.g. a
+                         NumpyTranspositionTable (see NumpyTranspositionTable.py). A table
+                         with storesFloatEvals False can not be used with preferFasterWin.
+    moveOrderingHeuristics - If True, the alpha-beta search orders moves by the killer move and
+                             history heuristics, after the transposition table move. Moves must
+                             then be hashable, e.g. ints or tuples.
+    quiescenceMoves_callback - Optional. quiescenceMoves_callback(maximizingPlayer) shall return the
+                               "noisy" moves of the player in turn, e.g. captures, that may change
+                               the eval a lot. When given, the alpha-beta search does not stop at
+                               depth 0 but goes on with only these moves, at most quiescenceDepth
+                               moves deeper. The player in turn may also stop there if the eval
+                               is good enough ("stand pat"). Then a big change right after the
+                               last searched move (horizon effect) is not missed.
+                               Only the alpha-beta search (MINMAXALPHABETAPRUNING_ALGO) uses it.
+                               minimax, minimaxWithLogging and the history search stop at depth 0.
+    cacheMoveLists - If True, the alpha-beta search with zobristHash_callback keeps the move list of
+                     every position it reads one for, until the next calculateMove. Positions
+                     that come up again, through another move order or in the next iteration
+                     of iterative deepening, then don't call "getListOfPossi..." again.
+                     Costs memory for one list per position searched.
+    aspirationWindow - Optional. With iterative deepening, search each depth first with the window
+                       eval of the depth before +- aspirationWindow, e.g. 10. Must be > 0. A narrow
+                       window cuts off more. If the eval falls outside, the window is made twice as
+                       wide and the depth searched again. Iterative deepening, and so the window,
+                       is only used by the alpha-beta search with zobristHash_callback.
+    preferFasterWin - If True, minimax and the alpha-beta search discount evals by how many
+                      moves away they are, so a win in 1 is picked before a win in 5 and a
+                      loss is put off as long as possible. Evals become floats.
+    njitMinimax - Optional. An NjitMinimax (see MinMaxAlgorithmNumba.py) for games whose state is a
+                  numpy array. Used by minimaxNjit.
+    bitboardEval_callback - Optional, for games whose whole position fits in one int (bitboard),
+                            see Bitboard.py. Return the eval of the position given as argument.
+    bitboardMoves_callback - bitboardMoves_callback(board, maximizingPlayer) shall return a list
+                             with one int per possible move: the bits that change by the move.
+                             Used by minimaxBitboard, which makes a move by XOR:ing it into the
+                             board and needs no move or undo callbacks.
+    writePossibleMovesAsMaximizer_callback - Optional, for games where a move is an int. Write all
+                                             possible moves for maximizer player into the array given
+                                             as argument (room for maxMoves moves) and return how many
+                                             they are. When given, minimax uses these instead of
+                                             "getListOfPossi..." so that no list is created per node.
+    writePossibleMovesAsMinimizer_callback - As above but for minimizer player. Give both or none.
+    evalDelta_callback - Optional. evalDelta_callback(move, maximizingPlayer) shall return how much
+                         the eval changes by the move, called right after the move is made. When
+                         given, minimax and the alpha-beta search call evalFunc_callback only once,
+                         at the root, and then keep the eval up to date by adding the deltas
+                         (and taking them away again at undo). This is much cheaper than an
+                         evalFunc_callback that looks at the whole board in every bottom node.
+                         Use int deltas; float deltas may add up to rounding errors.
+    nullMove_callback - Optional. Let the player in turn pass, so the other player moves next.
+    undoNullMove_callback - Take back the pass. When both are given, the alpha-beta search
+                            tries null-move pruning: if passing, searched nullMoveReduction
+                            moves less deep, is still too good for the opponent to allow, a
+                            real move will be too, and the node is cut off. Only safe in games
+                            where a move is always better than passing (not in zugzwang).
+    nullMoveAllowed_callback - Optional. Return False for positions where passing may be the
+                               best "move" (zugzwang). Null-move pruning is not tried there.
+
+    Games with one move, undo and move list callback for both players, taking
+    the player as first argument, can use GameAlgo.fromSideCallbacks instead.
+
+    The search methods minimax, minimaxWithLogging and minMaxAlphaBetaPruning return
+    a Result (eval, bestMove). minMaxAlphaBetaPruningWithHistory returns a ResultH
+    (eval, bestMove, history), and calculateMoveWithHistory the same as a dict.
 
     """
 
+    # Fixed attributes give every GameAlgo the same layout, which lets a
+    # tracing JIT (PyPy) turn the attribute lookups in the search into plain reads.
+    __slots__ = ('evalFunc_callback',
+                 'maximizerMoveFunc_callback',
+                 'minimizerMoveFunc_callback',
+                 'maximizerUndoMoveFunc_callback',
+                 'minimizerUndoMoveFunc_callback',
+                 'getListOfPossibleMovesAsMaximizer_callback',
+                 'getListOfPossibleMovesAsMinimizer_callback',
+                 'MIN_EVAL', 'MAX_EVAL', 'DEPTH',
+                 'zobristHash_callback', 'transpositionTable',
+                 'njitMinimax', 'bitboardEval_callback', 'bitboardMoves_callback',
+                 'writePossibleMovesAsMaximizer_callback',
+                 'writePossibleMovesAsMinimizer_callback',
+                 'maxMoves', 'moveBuffers',
+                 'processPool', 'processInterrupt', 'preferFasterWin',
+                 'moveOrderingHeuristics', 'killerMoves', 'historyScores',
+                 'evalDelta_callback', 'currentEval',
+                 'nullMove_callback', 'undoNullMove_callback', 'nullMoveAllowed_callback',
+                 'nullMoveReduction', 'aspirationWindow', 'moveCache',
+                 'quiescenceMoves_callback', 'quiescenceDepth',
+                 'logger', 'onGoingAnalyze', 'interruptFlag')
+
     def __init__(self, evalFunc_callback,
                  maximizerMoveFunc_callback,
                  minimizerMoveFunc_callback,
@@ -77,7 +287,16 @@ class GameAlgo:
                  minimizerUndoMoveFunc_callback,
                  getListOfPossibleMovesAsMaximizer_callback,
                  getListOfPossibleMovesAsMinimizer_callback,
-                 minEval=-100, maxEval=100, depth=6):
+                 minEval=-100, maxEval=100, depth=6,
+                 zobristHash_callback=None, transpositionTableSize=1 << 18, transpositionTable=None,
+                 njitMinimax=None, bitboardEval_callback=None, bitboardMoves_callback=None,
+                 writePossibleMovesAsMaximizer_callback=None,
+                 writePossibleMovesAsMinimizer_callback=None, maxMoves=256,
+                 preferFasterWin=False, moveOrderingHeuristics=False,
+                 evalDelta_callback=None,
+                 nullMove_callback=None, undoNullMove_callback=None, nullMoveAllowed_callback=None,
+                 nullMoveReduction=2, aspirationWindow=None, cacheMoveLists=False,
+                 quiescenceMoves_callback=None, quiescenceDepth=4):
 
         self.evalFunc_callback = evalFunc_callback
         self.maximizerMoveFunc_callback = maximizerMoveFunc_callback
@@ -89,80 +308,532 @@ class GameAlgo:
         self.MIN_EVAL = minEval
         self.MAX_EVAL = maxEval
         self.DEPTH = depth
+        self.zobristHash_callback = zobristHash_callback
+        if transpositionTable is None:
+            # The table is big, so it is only made if it can be used
+            if zobristHash_callback is not None:
+                transpositionTable = TranspositionTable(transpositionTableSize)
+        elif preferFasterWin and not getattr(transpositionTable, 'storesFloatEvals', True):
+            raise ValueError("preferFasterWin gives float evals, which " + type(transpositionTable).__name__
+                             + " can not store")
+        self.transpositionTable = transpositionTable
+        self.njitMinimax = njitMinimax
+        self.bitboardEval_callback = bitboardEval_callback
+        self.bitboardMoves_callback = bitboardMoves_callback
+        # minimax reads the moves of both players from one kind of callback
+        if (writePossibleMovesAsMaximizer_callback is None) != (writePossibleMovesAsMinimizer_callback is None):
+            raise ValueError("Give both writePossibleMovesAsMaximizer_callback and "
+                             "writePossibleMovesAsMinimizer_callback, or none of them")
+        self.writePossibleMovesAsMaximizer_callback = writePossibleMovesAsMaximizer_callback
+        self.writePossibleMovesAsMinimizer_callback = writePossibleMovesAsMinimizer_callback
+        self.maxMoves = maxMoves
+        self.moveBuffers = []
+
+        self.processPool = None
+        self.processInterrupt = None
+        self.preferFasterWin = preferFasterWin
+        self.moveOrderingHeuristics = moveOrderingHeuristics
+        self.killerMoves = []
+        self.historyScores = {}
+        self.evalDelta_callback = evalDelta_callback
+        self.currentEval = None
+        self.nullMove_callback = nullMove_callback
+        self.undoNullMove_callback = undoNullMove_callback
+        self.nullMoveAllowed_callback = nullMoveAllowed_callback
+        self.nullMoveReduction = nullMoveReduction
+        # A window of 0 would never get wider when the eval falls outside it
+        if aspirationWindow is not None and not aspirationWindow > 0:
+            raise ValueError("aspirationWindow must be > 0, got " + repr(aspirationWindow))
+        self.aspirationWindow = aspirationWindow
+        self.moveCache = {} if cacheMoveLists else None
+        self.quiescenceMoves_callback = quiescenceMoves_callback
+        self.quiescenceDepth = quiescenceDepth
+        self.logger = logging.getLogger()
 
         self.onGoingAnalyze = False
         self.interruptFlag = False
 
+    def __getstate__(self):
+        # Used for the copies sent to worker processes by calculateMoveParallel.
+        # The process pool can not be pickled, and the transposition table is too
+        # big to send along with every move. The copy gets an empty table of the same kind.
+        state = {name: getattr(self, name) for name in self.__slots__}
+        state['processPool'] = None
+        state['processInterrupt'] = None
+        if self.moveCache is not None:
+            state['moveCache'] = {}
+        if self.transpositionTable is not None:
+            state['transpositionTable'] = (type(self.transpositionTable), self.transpositionTable.size)
+        return state
+
+    def __setstate__(self, state):
+        if state['transpositionTable'] is not None:
+            tableClass, tableSize = state['transpositionTable']
+            state['transpositionTable'] = tableClass(tableSize)
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    @classmethod
+    def fromBitboardState(cls, state, **kwargs):
+        # A GameAlgo playing on a BitboardState (see Bitboard.py), which is
+        # changed in place by the search. Other GameAlgo arguments can be given as keywords.
+        kwargs.setdefault('zobristHash_callback', state.hash)
+        kwargs.setdefault('writePossibleMovesAsMaximizer_callback', state.writePossibleMoves)
+        kwargs.setdefault('writePossibleMovesAsMinimizer_callback', state.writePossibleMoves)
+        kwargs.setdefault('maxMoves', state.squares)
+        kwargs.setdefault('bitboardEval_callback', state.packedEvaluate)
+        kwargs.setdefault('bitboardMoves_callback', state.packedMoves)
+        return cls(state.evaluate,
+                   state.maximizerMove, state.minimizerMove,
+                   state.maximizerUndoMove, state.minimizerUndoMove,
+                   state.possibleMoves, state.possibleMoves,
+                   **kwargs)
+
+    @classmethod
+    def fromSideCallbacks(cls, evalFunc_callback, moveFunc_callback, undoMoveFunc_callback,
+                          getListOfPossibleMoves_callback, **kwargs):
+        # A GameAlgo for games that have one callback for both players, with
+        # the player as first argument: MAXIMIZER_SIDE or MINIMIZER_SIDE.
+        #   moveFunc_callback(side, move), undoMoveFunc_callback(side, move),
+        #   getListOfPossibleMoves_callback(side)
+        # Other GameAlgo arguments can be given as keywords.
+        return cls(evalFunc_callback,
+                   partial(moveFunc_callback, MAXIMIZER_SIDE), partial(moveFunc_callback, MINIMIZER_SIDE),
+                   partial(undoMoveFunc_callback, MAXIMIZER_SIDE), partial(undoMoveFunc_callback, MINIMIZER_SIDE),
+                   partial(getListOfPossibleMoves_callback, MAXIMIZER_SIDE),
+                   partial(getListOfPossibleMoves_callback, MINIMIZER_SIDE),
+                   **kwargs)
+
+    def newGame(self):
+        # The transposition table and move ordering are kept between moves.
+        # Forget them when a new game starts.
+        if self.transpositionTable is not None:
+            self.transpositionTable.clear()
+        self.killerMoves = []
+        self.historyScores = {}
+
+    def startSearch(self):
+        # Called at the start of every new search from the root
+        self.interruptFlag = False
+        if self.transpositionTable is not None:
+            self.transpositionTable.newSearch()
+        if self.moveCache is not None:
+            self.moveCache.clear()
+        # The move ordering is kept between moves, but what gave cutoffs
+        # in the searches before counts for less and less.
+        if self.historyScores:
+            self.historyScores = {key: score // 2 for key, score in self.historyScores.items() if score > 1}
+
     def interruptAnalyze(self):
         self.interruptFlag = True
+        # Also the copies searching in the worker processes of calculateMoveParallel
+        if self.processInterrupt is not None:
+            self.processInterrupt.set()
 
     def calculateMove(self, whichAlgo, maximizingPlayer, depth):
-        self.interruptFlag = False
-        if whichAlgo == MINMAX_ALGO:
-            myMove = self.minimax(depth, maximizingPlayer)
-        elif whichAlgo == MINMAXALPHABETAPRUNING_ALGO:
-            myMove = self.minMaxAlphaBetaPruning(depth, maximizingPlayer, self.MIN_EVAL, self.MAX_EVAL)
-        elif whichAlgo == MINMAX_ALGO_WITH_LOGGING:
-            myMove = self.minimaxWithLogging(depth, maximizingPlayer)
-        else:
-            myMove = self.minimax(self.DEPTH, maximizingPlayer)
-        return myMove[KEY_BESTMOVE]
-
-    def calculateMoveWithHistory(self, whichAlgo, maximizingPlayer, depth):
-        myMove = None
-        if whichAlgo == MINMAXALPHABETAPRUNINGWITHHISTORY_ALGO:
-            myMove = self.minMaxAlphaBetaPruningWithHistory(depth, maximizingPlayer, self.MIN_EVAL, self.MAX_EVAL)
-        return myMove
-
-    #This code is clean school book example
-    def minimax(self, depth, maximizingPlayer):
+        algoMoveName = self.ALGO_MOVES.get(whichAlgo)
+        if algoMoveName is None:
+            # Unknown algo. Plain minimax to the depth given when created.
+            algoMoveName = 'minimaxMove'
+            depth = self.DEPTH
+        # Looked up on self, so an override in a subclass is used
+        algoMove = getattr(self, algoMoveName)
+        if depth > DEEP_SEARCH_DEPTH:
+            return _runOnDeepStack(depth, algoMove, maximizingPlayer, depth)
+        return algoMove(maximizingPlayer, depth)
+
+    # The names of the methods calculateMove can run, each giving the best move.
+    # A subclass can override them, or add an algo of its own to a copy of ALGO_MOVES.
+
+    def minimaxMove(self, maximizingPlayer, depth):
+        self.startSearch()
+        return self.minimax(depth, maximizingPlayer, self.MIN_EVAL, self.MAX_EVAL).bestMove
+
+    def alphaBetaMove(self, maximizingPlayer, depth):
+        if self.zobristHash_callback is not None:
+            return self.calculateMoveIterativeDeepening(maximizingPlayer, depth)
+        self.startSearch()
+        if (self.moveOrderingHeuristics or self.nullMove_callback is not None
+                or self.quiescenceMoves_callback is not None):
+            return self.minMaxAlphaBetaPruning(depth, maximizingPlayer, self.MIN_EVAL, self.MAX_EVAL).bestMove
+        # Without a transposition table, move ordering, null moves or quiescence there is nothing
+        # that negamax does better, and minimax with a window does the same
+        # pruning without a python call per node.
+        return self.minimax(depth, maximizingPlayer, self.MIN_EVAL, self.MAX_EVAL).bestMove
+
+    def minimaxWithLoggingMove(self, maximizingPlayer, depth):
+        self.startSearch()
+        return self.minimaxWithLogging(depth, maximizingPlayer).bestMove
+
+    ALGO_MOVES = {MINMAX_ALGO: 'minimaxMove',
+                  MINMAXALPHABETAPRUNING_ALGO: 'alphaBetaMove',
+                  MINMAX_ALGO_WITH_LOGGING: 'minimaxWithLoggingMove'}
+
+    def calculateMoveIterativeDeepening(self, maximizingPlayer, maxDepth):
+        # Alpha-beta search to depth 1, 2, ... maxDepth. Each iteration leaves its
+        # best moves in the transposition table. The next, deeper, iteration tries
+        # them first, which gives many more cutoffs. The shallow iterations are cheap
+        # compared to the last one. Needs zobristHash_callback.
+        # If interrupted, the move of the deepest completed iteration is returned.
+        # Ordering the other moves by their evals from the iteration before saved
+        # nothing measurable, also at the root only: the best move already comes
+        # first, and most other evals are only null window bounds.
+        self.startSearch()
+        myMove = Result(None, None)
+        for iterationDepth in range(1, maxDepth + 1):
+            if self.interruptFlag and iterationDepth > 1:
+                break
+            if self.aspirationWindow is not None and iterationDepth > 1:
+                iterationMove = self.aspirationSearch(iterationDepth, maximizingPlayer, myMove.eval)
+            else:
+                iterationMove = self.minMaxAlphaBetaPruning(iterationDepth, maximizingPlayer, self.MIN_EVAL, self.MAX_EVAL)
+            if self.interruptFlag and iterationDepth > 1:
+                # Not completed. Stay with the deepest completed iteration.
+                break
+            myMove = iterationMove
+        return myMove.bestMove
+
+    def aspirationSearch(self, depth, maximizingPlayer, expectedEval):
+        # The eval seldom changes much from one depth to the next. Search with
+        # a window around the expected eval, and only if the eval turns out to
+        # be outside, widen the window on that side and search again.
+        window = self.aspirationWindow
+        alpha = max(expectedEval - window, self.MIN_EVAL)
+        beta = min(expectedEval + window, self.MAX_EVAL)
+        while True:
+            result = self.minMaxAlphaBetaPruning(depth, maximizingPlayer, alpha, beta)
+            if self.interruptFlag:
+                return result
+            if result.eval <= alpha and alpha > self.MIN_EVAL:
+                window *= 2
+                alpha = max(expectedEval - window, self.MIN_EVAL)
+            elif result.eval >= beta and beta < self.MAX_EVAL:
+                window *= 2
+                beta = min(expectedEval + window, self.MAX_EVAL)
+            else:
+                return result
+
+    def calculateMoveParallel(self, whichAlgo, maximizingPlayer, depth, workers=None):
+        # The moves at the root are searched at the same time in worker processes,
+        # each on its own copy of this GameAlgo and the game, so both must be picklable.
+        # The worker processes are kept for the next call; see closeProcessPool.
+        # interruptAnalyze stops the workers too.
+        if whichAlgo == MINMAX_ALGO_WITH_LOGGING:
+            # The log is for following one search, not many at once
+            return self.calculateMove(whichAlgo, maximizingPlayer, depth)
+        if whichAlgo not in self.ALGO_MOVES:
+            # Unknown algo. As calculateMove, plain minimax to the depth given when created.
+            whichAlgo = MINMAX_ALGO
+            depth = self.DEPTH
         if maximizingPlayer:
             moveList = self.getListOfPossibleMovesAsMaximizer_callback()
         else:
             moveList = self.getListOfPossibleMovesAsMinimizer_callback()
-
-        if depth == 0 or len(moveList) == 0:
-            bottomEval = self.evalFunc_callback()
-            return {KEY_EVAL: bottomEval, KEY_BESTMOVE: None}
-
+        if depth < 2 or len(moveList) < 4:
+            # Not worth starting workers for
+            return self.calculateMove(whichAlgo, maximizingPlayer, depth)
+
+        self.startSearch()
+        if self.processInterrupt is not None:
+            self.processInterrupt.clear()
+
+        # Searching the moves apart loses the cutoffs between them. So search
+        # the most likely best move first, here, and give its eval to the
+        # workers as limit for the rest.
+        bestMove = moveList[0]
+        if self.zobristHash_callback is not None:
+            ttKey = self.zobristHash_callback()
+            if not maximizingPlayer:
+                ttKey ^= ZOBRIST_MINIMIZER_KEY
+            ttEntry = self.transpositionTable.probe(ttKey)
+            if ttEntry is not None and ttEntry[TT_BESTMOVE] in moveList:
+                bestMove = ttEntry[TT_BESTMOVE]
+        bestEval = self.searchRootMove(whichAlgo, bestMove, maximizingPlayer, depth, self.MIN_EVAL, self.MAX_EVAL)
+        if self.interruptFlag:
+            return bestMove
         if maximizingPlayer:
-            evalMaxResult = {KEY_EVAL: self.MIN_EVAL, KEY_BESTMOVE: None}
-            for move in moveList:
-
-                #Try a move
-                self.maximizerMoveFunc_callback(move)
-
-                # RECUR
-                evalResult = self.minimax(depth-1, False)
-
-                #Remove token before next loop
-                self.maximizerUndoMoveFunc_callback(move)
-
-                # Is this move better?
-                if evalResult[KEY_EVAL] > evalMaxResult[KEY_EVAL]:
-                    evalMaxResult[KEY_EVAL] = evalResult[KEY_EVAL]
-                    evalMaxResult[KEY_BESTMOVE] = move
-            return evalMaxResult
-
-        #Minimizer
+            alpha, beta = bestEval, self.MAX_EVAL
         else:
-            evalMinResult = {KEY_EVAL: self.MAX_EVAL, KEY_BESTMOVE: None}
-            for move in moveList:
-
-                # Try a move
-                self.minimizerMoveFunc_callback(move)
-
-                # RECUR
-                evalResult = self.minimax(depth - 1, True)
+            alpha, beta = self.MIN_EVAL, bestEval
+
+        # The rest of the moves are dealt out in one chunk per worker, so this
+        # GameAlgo and the game are sent once per worker and not once per move.
+        # Dealt round robin, the likely good moves early in the list are spread out.
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if self.processPool is None:
+            # The workers get the interrupt event when they start. It can not be sent with the searches.
+            self.processInterrupt = multiprocessing.Event()
+            self.processPool = ProcessPoolExecutor(max_workers=workers, initializer=_initWorker,
+                                                   initargs=(self.processInterrupt,))
+            if self.interruptFlag:
+                self.processInterrupt.set()
+        otherMoves = [move for move in moveList if move != bestMove]
+        chunks = [otherMoves[i::workers] for i in range(min(workers, len(otherMoves)))]
+        futures = [self.processPool.submit(_searchRootMoves, self, whichAlgo, chunk,
+                                           maximizingPlayer, depth, alpha, beta)
+                   for chunk in chunks]
+        for future in futures:
+            moveEval, move = future.result()
+            if (moveEval > bestEval) if maximizingPlayer else (moveEval < bestEval):
+                bestEval = moveEval
+                bestMove = move
+        return bestMove
+
+    def searchRootMove(self, whichAlgo, move, maximizingPlayer, depth, alpha, beta):
+        # Eval of making "move" at the root of a depth deep search.
+        if maximizingPlayer:
+            self.maximizerMoveFunc_callback(move)
+        else:
+            self.minimizerMoveFunc_callback(move)
+        if whichAlgo == MINMAX_ALGO:
+            moveEval = self.minimax(depth - 1, not maximizingPlayer, alpha, beta).eval
+        else:
+            moveEval = self.minMaxAlphaBetaPruning(depth - 1, not maximizingPlayer, alpha, beta).eval
+        if maximizingPlayer:
+            self.maximizerUndoMoveFunc_callback(move)
+        else:
+            self.minimizerUndoMoveFunc_callback(move)
+        return moveEval
+
+    def searchRootMoves(self, whichAlgo, moves, maximizingPlayer, depth, alpha, beta):
+        # Best (eval, move) of the moves at the root. The window is tightened
+        # by each move, so the later ones are searched with less work.
+        bestEval = None
+        bestMove = None
+        for move in moves:
+            moveEval = self.searchRootMove(whichAlgo, move, maximizingPlayer, depth, alpha, beta)
+            if bestEval is None or ((moveEval > bestEval) if maximizingPlayer else (moveEval < bestEval)):
+                bestEval = moveEval
+                bestMove = move
+            if maximizingPlayer:
+                alpha = max(alpha, moveEval)
+            else:
+                beta = min(beta, moveEval)
+        return (bestEval, bestMove)
+
+    def closeProcessPool(self):
+        if self.processPool is not None:
+            self.processPool.shutdown()
+            self.processPool = None
+            self.processInterrupt = None
 
-                # Remove token before next loop
-                self.minimizerUndoMoveFunc_callback(move)
+    def calculateMoveWithHistory(self, whichAlgo, maximizingPlayer, depth):
+        myMove = None
+        if whichAlgo == MINMAXALPHABETAPRUNINGWITHHISTORY_ALGO:
+            if depth > DEEP_SEARCH_DEPTH:
+                result = _runOnDeepStack(depth, self.minMaxAlphaBetaPruningWithHistory,
+                                         depth, maximizingPlayer, self.MIN_EVAL, self.MAX_EVAL)
+            else:
+                result = self.minMaxAlphaBetaPruningWithHistory(depth, maximizingPlayer, self.MIN_EVAL, self.MAX_EVAL)
+            myMove = {KEY_EVAL: result.eval, KEY_BESTMOVE: result.bestMove, KEY_HISTORY: list(result.history)}
+        return myMove
 
-                # Is this move better?
-                if evalResult[KEY_EVAL] < evalMinResult[KEY_EVAL]:
-                    evalMinResult[KEY_EVAL] = evalResult[KEY_EVAL]
-                    evalMinResult[KEY_BESTMOVE] = move
-            return evalMinResult
+    #This is the school book example (see "minimaxWithLogging" for the same
+    #search written as plain recursion), with the alpha-beta window threaded
+    #through so that branches that can not change the result are cut off.
+    #Call it with alpha=None and beta=None for the plain minimax.
+    #
+    #Instead of recurring, the nodes on the way down to the current one are
+    #kept on an explicit stack. This saves the cost of a python call per node.
+    def minimax(self, depth, maximizingPlayer, alpha=None, beta=None):
+        # Local names for what is used at every node
+        evalFunc = self.evalFunc_callback
+        maximizerMove = self.maximizerMoveFunc_callback
+        minimizerMove = self.minimizerMoveFunc_callback
+        maximizerUndoMove = self.maximizerUndoMoveFunc_callback
+        minimizerUndoMove = self.minimizerUndoMoveFunc_callback
+        maximizerMoves = self.getListOfPossibleMovesAsMaximizer_callback
+        minimizerMoves = self.getListOfPossibleMovesAsMinimizer_callback
+        writeMaximizerMoves = self.writePossibleMovesAsMaximizer_callback
+        writeMinimizerMoves = self.writePossibleMovesAsMinimizer_callback
+        minEval = self.MIN_EVAL
+        maxEval = self.MAX_EVAL
+        pruning = alpha is not None
+        preferFasterWin = self.preferFasterWin
+        rootDepth = depth
+
+        # With evalDelta_callback the eval is kept up to date move by move
+        evalDelta = self.evalDelta_callback
+        if evalDelta is not None:
+            currentEval = evalFunc()
+
+        # Moves are written into one reused buffer per depth. There is never
+        # more than one node per depth on the stack, so they don't overwrite each other.
+        useMoveBuffers = writeMaximizerMoves is not None
+        if useMoveBuffers:
+            moveBuffers = self.getMoveBuffers(depth)
+
+        # A frame is:
+        # [depth, maximizingPlayer, move iterator, move being tried, best eval, best move, alpha, beta,
+        #  eval delta of the move being tried]
+        stack = []
+        while True:
+            # Enter the node given by depth, maximizingPlayer, alpha and beta.
+            # Don't need to read out list if depth == 0!!
+            if depth == 0:
+                moveCount = 0
+            elif useMoveBuffers:
+                moveBuffer = moveBuffers[depth]
+                if maximizingPlayer:
+                    moveCount = writeMaximizerMoves(moveBuffer)
+                else:
+                    moveCount = writeMinimizerMoves(moveBuffer)
+                moveIterator = islice(moveBuffer, moveCount)
+                if moveCount:
+                    firstMove = moveBuffer[0]
+            else:
+                if maximizingPlayer:
+                    moveList = maximizerMoves()
+                else:
+                    moveList = minimizerMoves()
+                moveCount = len(moveList)
+                moveIterator = iter(moveList)
+                if moveCount:
+                    firstMove = moveList[0]
+
+            if moveCount == 0:
+                childEval = evalFunc() if evalDelta is None else currentEval
+                if preferFasterWin:
+                    childEval *= FASTER_WIN_DISCOUNT ** (rootDepth - depth)
+                if not stack:
+                    return Result(childEval, None)
+                childDone = True
+            else:
+                # The first move is the best move until a better one is found, so a node
+                # where every move loses still has a move to give.
+                stack.append([depth, maximizingPlayer, moveIterator, None,
+                              minEval if maximizingPlayer else maxEval, firstMove, alpha, beta, 0])
+                childDone = False
+
+            # Go back up until there is a new move to try
+            while True:
+                frame = stack[-1]
+                cutoff = False
+                if childDone:
+                    move = frame[3]
+                    if evalDelta is not None:
+                        currentEval -= frame[8]
+                    if frame[1]:
+                        #Remove token before next move
+                        maximizerUndoMove(move)
+
+                        # Is this move better?
+                        if childEval > frame[4]:
+                            frame[4] = childEval
+                            frame[5] = move
+
+                        # Minimizer above me will not let me get more than "beta".
+                        if pruning:
+                            if frame[4] > frame[6]:
+                                frame[6] = frame[4]
+                            cutoff = frame[7] <= frame[6]
+                    else:
+                        # Remove token before next move
+                        minimizerUndoMove(move)
+
+                        # Is this move better?
+                        if childEval < frame[4]:
+                            frame[4] = childEval
+                            frame[5] = move
+
+                        # Maximizer above me will not let me get less than "alpha".
+                        if pruning:
+                            if frame[4] < frame[7]:
+                                frame[7] = frame[4]
+                            cutoff = frame[7] <= frame[6]
+
+                # When interrupted, all nodes on the stack are finished with what they have.
+                if cutoff or self.interruptFlag:
+                    move = _NO_MOVE
+                else:
+                    move = next(frame[2], _NO_MOVE)
+                if move is _NO_MOVE:
+                    # This node is done. Give its eval to the node above.
+                    stack.pop()
+                    if not stack:
+                        return Result(frame[4], frame[5])
+                    childEval = frame[4]
+                    childDone = True
+                    continue
+
+                #Try a move and go down into it
+                frame[3] = move
+                if frame[1]:
+                    maximizerMove(move)
+                else:
+                    minimizerMove(move)
+                if evalDelta is not None:
+                    frame[8] = evalDelta(move, frame[1])
+                    currentEval += frame[8]
+                depth = frame[0] - 1
+                maximizingPlayer = not frame[1]
+                alpha = frame[6]
+                beta = frame[7]
+                break
+
+    def getMoveBuffers(self, depth):
+        # One move buffer for every depth down to 0, made once and then reused.
+        while len(self.moveBuffers) <= depth:
+            self.moveBuffers.append(array('i', [0] * self.maxMoves))
+        return self.moveBuffers
+
+    #Same search as minimax with pruning, but compiled with Numba. The game is
+    #the numpy array "board" which is changed by the compiled callbacks given
+    #to the NjitMinimax object.
+    def minimaxNjit(self, board, depth, maximizingPlayer, alpha=None, beta=None):
+        if alpha is None:
+            alpha = self.MIN_EVAL
+        if beta is None:
+            beta = self.MAX_EVAL
+        return Result(*self.njitMinimax(board, depth, maximizingPlayer, alpha, beta, self.MIN_EVAL, self.MAX_EVAL))
+
+    #Same search as minimax with pruning, for a game given as one int "board"
+    #(see bitboardMoves_callback). A move is XOR:ed into the board given to the
+    #node below, so taking it back is free and there is no callback per move.
+    #The best move returned is the int of bits that it changes.
+    def minimaxBitboard(self, board, depth, maximizingPlayer, alpha=None, beta=None):
+        if alpha is None:
+            alpha = self.MIN_EVAL
+        if beta is None:
+            beta = self.MAX_EVAL
+        evalFunc = self.bitboardEval_callback
+        movesFunc = self.bitboardMoves_callback
+        minEval = self.MIN_EVAL
+        maxEval = self.MAX_EVAL
+
+        def search(board, depth, maximizingPlayer, alpha, beta):
+            if depth == 0:
+                return evalFunc(board), None
+            moves = movesFunc(board, maximizingPlayer)
+            if not moves:
+                return evalFunc(board), None
+            bestMove = moves[0]
+            if maximizingPlayer:
+                bestEval = minEval
+                for move in moves:
+                    childEval = search(board ^ move, depth - 1, False, alpha, beta)[0]
+                    if childEval > bestEval:
+                        bestEval = childEval
+                        bestMove = move
+                        if bestEval > alpha:
+                            alpha = bestEval
+                            if beta <= alpha:
+                                break
+            else:
+                bestEval = maxEval
+                for move in moves:
+                    childEval = search(board ^ move, depth - 1, True, alpha, beta)[0]
+                    if childEval < bestEval:
+                        bestEval = childEval
+                        bestMove = move
+                        if bestEval < beta:
+                            beta = bestEval
+                            if beta <= alpha:
+                                break
+            return bestEval, bestMove
+
+        return Result(*search(board, depth, maximizingPlayer, alpha, beta))
 
     #This code is with logging for better understanding while analyzing
     #afterward.
@@ -174,157 +845,349 @@ class GameAlgo:
         if nn == None:
             nn = "ROOT"
 
-        if maximizingPlayer:
+        # The log lines and node names are only made when they will be logged.
+        log = self.logger
+        logInfo = log.isEnabledFor(logging.INFO)
+        if logInfo:
+            indent = "-" * ((self.DEPTH - depth) * ident)
+
+        #Don't need to read out list if depth == 0!!
+        if depth == 0:
+            moveList = []
+        elif maximizingPlayer:
             moveList = self.getListOfPossibleMovesAsMaximizer_callback()
         else:
             moveList = self.getListOfPossibleMovesAsMinimizer_callback()
 
-        if depth == 0 or len(moveList) == 0:
+        if not moveList:
             bottomEval = self.evalFunc_callback()
-            logging.info("-" *((self.DEPTH-depth)*ident) + maxMinInfo + nn+" ***BOTTOM*** Evaluated to:"+str(bottomEval))
-            return {KEY_EVAL: bottomEval, KEY_BESTMOVE: None}
+            if logInfo:
+                log.info("%s%s%s ***BOTTOM*** Evaluated to:%s", indent, maxMinInfo, nn, bottomEval)
+            return Result(bottomEval, None)
 
-        logging.info("-" * ((self.DEPTH - depth) * ident) + maxMinInfo + nn)
+        if logInfo:
+            log.info("%s%s%s", indent, maxMinInfo, nn)
+
+        # Local names for what is used for every move in the loops
+        search = self.minimaxWithLogging
 
         if maximizingPlayer:
-            evalMaxResult = {KEY_EVAL: self.MIN_EVAL, KEY_BESTMOVE: None}
+            makeMove = self.maximizerMoveFunc_callback
+            undoMove = self.maximizerUndoMoveFunc_callback
+            bestEval = self.MIN_EVAL
+            bestMove = None
             for move in moveList:
 
                 if self.interruptFlag:
                     break
 
                 #Try a move
-                self.maximizerMoveFunc_callback(move)
+                makeMove(move)
 
                 # RECUR
-                evalResult = self.minimaxWithLogging(depth-1, False, nn+"/"+str(move))
+                evalResult = search(depth-1, False, nn+"/"+str(move) if logInfo else nn)
 
                 #Remove token before next loop
-                self.maximizerUndoMoveFunc_callback(move)
+                undoMove(move)
 
                 # Is this move better?
-                if evalResult[KEY_EVAL] > evalMaxResult[KEY_EVAL]:
-                    evalMaxResult[KEY_EVAL] = evalResult[KEY_EVAL]
-                    evalMaxResult[KEY_BESTMOVE] = move
-                    logging.info("-" * ((self.DEPTH - depth) * ident) + maxMinInfo + nn + " ...better move:"+str(move))
-            logging.info("-" * ((self.DEPTH - depth) * ident) + maxMinInfo + nn + " *BEST MOVE:" + str(evalMaxResult[KEY_BESTMOVE]))
-            return evalMaxResult
+                if evalResult.eval > bestEval:
+                    bestEval = evalResult.eval
+                    bestMove = move
+                    if logInfo:
+                        log.info("%s%s%s ...better move:%s", indent, maxMinInfo, nn, move)
+            if logInfo:
+                log.info("%s%s%s *BEST MOVE:%s", indent, maxMinInfo, nn, bestMove)
+            return Result(bestEval, bestMove)
 
         #Minimizer
         else:
-            evalMinResult = {KEY_EVAL: self.MAX_EVAL, KEY_BESTMOVE: None}
+            makeMove = self.minimizerMoveFunc_callback
+            undoMove = self.minimizerUndoMoveFunc_callback
+            bestEval = self.MAX_EVAL
+            bestMove = None
             for move in moveList:
 
                 if self.interruptFlag:
                     break
 
                 # Try a move
-                self.minimizerMoveFunc_callback(move)
+                makeMove(move)
 
                 # RECUR
-                evalResult = self.minimaxWithLogging(depth - 1, True, nn+"/"+str(move))
+                evalResult = search(depth - 1, True, nn+"/"+str(move) if logInfo else nn)
 
                 # Remove token before next loop
-                self.minimizerUndoMoveFunc_callback(move)
+                undoMove(move)
 
                 # Is this move better?
-                if evalResult[KEY_EVAL] < evalMinResult[KEY_EVAL]:
-                    evalMinResult[KEY_EVAL] = evalResult[KEY_EVAL]
-                    evalMinResult[KEY_BESTMOVE] = move
-                    logging.info("-" * ((self.DEPTH - depth) * ident) + maxMinInfo + nn + " ...better move:" + str(move))
-            logging.info("-" * ((self.DEPTH - depth) * ident) + maxMinInfo + nn + " *BEST MOVE:" + str(evalMinResult[KEY_BESTMOVE]))
-            return evalMinResult
-
-    def minMaxAlphaBetaPruning(self, depth, maximizingPlayer, alpha, beta, nn=None):
-        if nn is None:
-            nn="R "
+                if evalResult.eval < bestEval:
+                    bestEval = evalResult.eval
+                    bestMove = move
+                    if logInfo:
+                        log.info("%s%s%s ...better move:%s", indent, maxMinInfo, nn, move)
+            if logInfo:
+                log.info("%s%s%s *BEST MOVE:%s", indent, maxMinInfo, nn, bestMove)
+            return Result(bestEval, bestMove)
+
+    #No logging or node names here, it is the fast path. Use
+    #"minimaxWithLogging" to follow the search.
+    def minMaxAlphaBetaPruning(self, depth, maximizingPlayer, alpha, beta):
+        # The search is done as negamax, where evals are seen from the player
+        # in turn. Here the window and the result are turned to maximizer's view.
+        # negamax itself passes bare tuples (eval, best move) between nodes, they are the cheapest to make.
+        if self.evalDelta_callback is not None:
+            self.currentEval = self.evalFunc_callback()
+        if maximizingPlayer:
+            return Result(*self.negamax(depth, True, alpha, beta))
+        negamaxEval, bestMove = self.negamax(depth, False, -beta, -alpha)
+        return Result(-negamaxEval, bestMove)
+
+    #Alpha-beta search where alpha, beta and the returned eval are from the
+    #view of the player in turn. What is good for one player is equally bad
+    #for the other, so the eval of a move is minus the eval the opponent gets
+    #after it. Then maximizer and minimizer can share the same code.
+    #The null window tests assume evals come in steps of about 1; other evals
+    #still give the right result, just with less pruning.
+    #"ply" is how many moves this node is from the root.
+    #"allowNullMove" is False right after a null move, two passes in a row
+    #would search the same position again.
+    def negamax(self, depth, maximizingPlayer, alpha, beta, ply=0, allowNullMove=True):
+        if depth == 0 and self.quiescenceMoves_callback is not None:
+            return (self.quiescence(self.quiescenceDepth, maximizingPlayer, alpha, beta, ply), None)
         if depth == 0:
             #We're at the bottom node! Evaluate this node and return it up the tree.
-            bottomEval = self.evalFunc_callback()
-            return {KEY_EVAL: bottomEval, KEY_BESTMOVE: None}
+            bottomEval = self.evalFunc_callback() if self.evalDelta_callback is None else self.currentEval
+            if self.preferFasterWin:
+                bottomEval *= FASTER_WIN_DISCOUNT ** ply
+            return (bottomEval if maximizingPlayer else -bottomEval, None)
+
+        ttKey = None
+        ttEntry = None
+        if self.zobristHash_callback is not None:
+            ttKey = self.zobristHash_callback()
+            if not maximizingPlayer:
+                ttKey ^= ZOBRIST_MINIMIZER_KEY
+            ttEntry = self.transpositionTable.probe(ttKey)
+            if ttEntry is not None and ttEntry[TT_DEPTH] >= depth:
+                # Searched before at least as deep. Use what we know.
+                ttEval = ttEntry[TT_EVAL]
+                if self.preferFasterWin:
+                    ttEval *= FASTER_WIN_DISCOUNT ** ply
+                if ttEntry[TT_FLAG] == TT_EXACT:
+                    return (ttEval, ttEntry[TT_BESTMOVE])
+                elif ttEntry[TT_FLAG] == TT_LOWERBOUND:
+                    alpha = max(alpha, ttEval)
+                else:
+                    beta = min(beta, ttEval)
+                if beta <= alpha:
+                    return (ttEval, ttEntry[TT_BESTMOVE])
+        alphaSearched = alpha
+        betaSearched = beta
+
+        # Null move. Let the opponent move twice in a row, with a smaller search
+        # and a null window at beta. If I still get beta or more, a real move
+        # would give even more, so the opponent will not let the game come here.
+        # Never at the root, which must give a move.
+        if (allowNullMove and ply > 0 and depth >= NULL_MOVE_MIN_DEPTH and self.nullMove_callback is not None
+                and (self.nullMoveAllowed_callback is None or self.nullMoveAllowed_callback())):
+            self.nullMove_callback()
+            nullEval = -self.negamax(max(depth - 1 - self.nullMoveReduction, 0), not maximizingPlayer,
+                                     -beta, -beta + 1, ply + 1, False)[0]
+            self.undoNullMove_callback()
+            if nullEval >= beta and not self.interruptFlag:
+                return (nullEval, None)
+
+        # Move list of this position from earlier in the search, if cacheMoveLists.
+        # It is never changed, the move ordering makes new lists.
+        moveCache = self.moveCache
+        if moveCache is not None and ttKey is not None:
+            moveList = moveCache.get(ttKey)
+        else:
+            moveCache = None
+            moveList = None
 
         #Don't need to read out list if depth == 0!!
         if maximizingPlayer:
-            moveList = self.getListOfPossibleMovesAsMaximizer_callback()
+            if moveList is None:
+                moveList = self.getListOfPossibleMovesAsMaximizer_callback()
+            makeMove = self.maximizerMoveFunc_callback
+            undoMove = self.maximizerUndoMoveFunc_callback
+            bestEval = self.MIN_EVAL
         else:
-            moveList = self.getListOfPossibleMovesAsMinimizer_callback()
+            if moveList is None:
+                moveList = self.getListOfPossibleMovesAsMinimizer_callback()
+            makeMove = self.minimizerMoveFunc_callback
+            undoMove = self.minimizerUndoMoveFunc_callback
+            bestEval = -self.MAX_EVAL
+        if moveCache is not None and ttKey not in moveCache:
+            moveCache[ttKey] = moveList
+
+        if not moveList:
+            bottomEval = self.evalFunc_callback() if self.evalDelta_callback is None else self.currentEval
+            if self.preferFasterWin:
+                bottomEval *= FASTER_WIN_DISCOUNT ** ply
+            return (bottomEval if maximizingPlayer else -bottomEval, None)
+
+        # Best move from an earlier search of this position is tried first.
+        # It is likely to give an early cutoff.
+        ttMove = None if ttEntry is None else ttEntry[TT_BESTMOVE]
+        if self.moveOrderingHeuristics:
+            moveList = self.orderMoves(moveList, ttMove, maximizingPlayer, ply)
+        elif ttMove is not None and ttMove in moveList:
+            moveList = [ttMove] + [move for move in moveList if move != ttMove]
+
+        # Local names for what is used for every move in the loop
+        search = self.negamax
+        opponent = not maximizingPlayer
+        evalDelta = self.evalDelta_callback
+
+        bestMove = moveList[0]
+        firstMove = True
+        for move in moveList:
+
+            if self.interruptFlag:
+                break
+
+            #Try a move
+            makeMove(move)
+            if evalDelta is not None:
+                delta = evalDelta(move, maximizingPlayer)
+                self.currentEval += delta
+
+            # RECUR. The opponents window is my window turned around.
+            # Principal variation search: the first move is most likely the
+            # best, so the others are only tested with a null window to see if
+            # they are better than alpha. That is a much smaller search. Only a
+            # move that turns out better has to be searched again. The null window
+            # search already proved it gets at least moveEval, so that is the lower
+            # end of the window then.
+            if firstMove:
+                moveEval = -search(depth - 1, opponent, -beta, -alpha, ply + 1)[0]
+                firstMove = False
+            else:
+                moveEval = -search(depth - 1, opponent, -alpha - 1, -alpha, ply + 1)[0]
+                if alpha < moveEval < beta:
+                    moveEval = -search(depth - 1, opponent, -beta, -moveEval, ply + 1)[0]
+
+            #Remove token before next loop
+            undoMove(move)
+            if evalDelta is not None:
+                self.currentEval -= delta
+
+            # Is this move better?
+            if moveEval > bestEval:
+                bestEval = moveEval
+                bestMove = move
+
+            #Is this move the best I know so far?
+            if bestEval > alpha:
+                alpha = bestEval
+
+            # Opponent above me knows he can achieve "beta" (turned to my view).
+            # "alpha" is what I AT LEAST will throw back up at him. So, if the
+            # opponent above me has found a better move (beta<=alpha), he will
+            # NOT pick this branch anyway. So stop investigating further!
+            if beta <= alpha:
+                if self.moveOrderingHeuristics:
+                    self.rememberCutoffMove(move, maximizingPlayer, depth, ply)
+                break
+
+        self.storeInTranspositionTable(ttKey, depth, ply, alphaSearched, betaSearched, bestEval, bestMove)
+        return (bestEval, bestMove)
+
+    #Below the bottom node, only the noisy moves are searched, until the
+    #position is quiet. Same view of alpha, beta and eval as negamax.
+    def quiescence(self, quiescenceDepth, maximizingPlayer, alpha, beta, ply):
+        standPat = self.evalFunc_callback() if self.evalDelta_callback is None else self.currentEval
+        if self.preferFasterWin:
+            standPat *= FASTER_WIN_DISCOUNT ** ply
+        if not maximizingPlayer:
+            standPat = -standPat
 
-        if len(moveList) == 0:
-            bottomEval = self.evalFunc_callback()
-            return {KEY_EVAL: bottomEval, KEY_BESTMOVE: None}
+        # The player in turn does not have to make a noisy move. If the eval
+        # already gives a cutoff, or no deeper search is allowed, stop here.
+        if quiescenceDepth == 0 or standPat >= beta:
+            return standPat
+        if standPat > alpha:
+            alpha = standPat
 
         if maximizingPlayer:
-            evalMaxResult = {KEY_EVAL: self.MIN_EVAL, KEY_BESTMOVE: moveList[0]}
-            for move in moveList:
-
-                if self.interruptFlag:
-                    break
-
-                #Try a move
-                self.maximizerMoveFunc_callback(move)
-
-                # RECUR
-                evalResult = self.minMaxAlphaBetaPruning(depth-1, False, alpha, beta, nn+" "+str(move))
-
-                #Remove token before next loop
-                self.maximizerUndoMoveFunc_callback(move)
-
-                # Is this move better?
-                if evalResult[KEY_EVAL] > evalMaxResult[KEY_EVAL]:
-                    evalMaxResult[KEY_EVAL] = evalResult[KEY_EVAL]
-                    evalMaxResult[KEY_BESTMOVE] = move
-
-                #Is this move the best I know so far?
-                if evalMaxResult[KEY_EVAL] > alpha:
-                    alpha = evalMaxResult[KEY_EVAL]
-
-                # Minimizer above me knows he can achieve "beta".
-                # "alpha" is what I as maximizer AT LEAST will
-                # throw back up at him. So, if minimizer above
-                # me has found a better move (beta<=alpha), he will NOT pick
-                # this branch anyway. So stop investigating further!
-                if beta <= alpha:
-                    break
-
-            return evalMaxResult
-
-        #Minimizer
+            makeMove = self.maximizerMoveFunc_callback
+            undoMove = self.maximizerUndoMoveFunc_callback
         else:
-            evalMinResult = {KEY_EVAL: self.MAX_EVAL, KEY_BESTMOVE: moveList[0]}
-            for move in moveList:
-
-                if self.interruptFlag:
-                    print("Interrupt minmax")
-                    break
-
-                # Try a move
-                self.minimizerMoveFunc_callback(move)
-
-                # RECUR
-                evalResult = self.minMaxAlphaBetaPruning(depth - 1, True, alpha, beta, nn+str(move))
-
-                # Remove token before next loop
-                self.minimizerUndoMoveFunc_callback(move)
-
-                # Is this move better?
-                if evalResult[KEY_EVAL] < evalMinResult[KEY_EVAL]:
-                    evalMinResult[KEY_EVAL] = evalResult[KEY_EVAL]
-                    evalMinResult[KEY_BESTMOVE] = move
-
-                if evalMinResult[KEY_EVAL] < beta:
-                    evalMinResult[KEY_EVAL] = evalResult[KEY_EVAL]
-                    beta = evalMinResult[KEY_EVAL]
-
-                # Maximizer above me knows he can achieve "alpha".
-                # "beta" is what I as minimizer AT LEAST will
-                # throw back up at him. So, if maximizer above
-                # me has found a better move (beta<=alpha), he will NOT pick
-                # this branch anyway. So stop investigating further!
-                if beta <= alpha:
-                    break
-
-            return evalMinResult
-
+            makeMove = self.minimizerMoveFunc_callback
+            undoMove = self.minimizerUndoMoveFunc_callback
+        evalDelta = self.evalDelta_callback
+        search = self.quiescence
+        opponent = not maximizingPlayer
+
+        bestEval = standPat
+        for move in self.quiescenceMoves_callback(maximizingPlayer):
+            if self.interruptFlag:
+                break
+            makeMove(move)
+            if evalDelta is not None:
+                delta = evalDelta(move, maximizingPlayer)
+                self.currentEval += delta
+            moveEval = -search(quiescenceDepth - 1, opponent, -beta, -alpha, ply + 1)
+            undoMove(move)
+            if evalDelta is not None:
+                self.currentEval -= delta
+            if moveEval > bestEval:
+                bestEval = moveEval
+                if bestEval > alpha:
+                    alpha = bestEval
+                    if beta <= alpha:
+                        break
+        return bestEval
+
+    def orderMoves(self, moveList, ttMove, maximizingPlayer, ply):
+        # Transposition table move first. Then the killer moves, that gave a
+        # cutoff in another node at the same ply. Then the moves that have
+        # given most cutoffs (history). Otherwise in the order they came.
+        if ply < len(self.killerMoves):
+            killers = self.killerMoves[ply]
+        else:
+            killers = ()
+        historyScores = self.historyScores
+        return sorted(moveList, reverse=True,
+                      key=lambda move: (move == ttMove, move in killers,
+                                        historyScores.get((maximizingPlayer, move), 0)))
+
+    def rememberCutoffMove(self, move, maximizingPlayer, depth, ply):
+        while len(self.killerMoves) <= ply:
+            self.killerMoves.append([None, None])
+        killers = self.killerMoves[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        # A cutoff high up in the tree saves more work, so it counts more
+        key = (maximizingPlayer, move)
+        self.historyScores[key] = self.historyScores.get(key, 0) + depth * depth
+
+    def storeInTranspositionTable(self, ttKey, depth, ply, alpha, beta, evaluation, bestMove):
+        # Nothing to store without a hash, and an interrupted search is not complete.
+        if ttKey is None or self.interruptFlag:
+            return
+        # The eval is only exact if it is inside the window it was searched with.
+        if evaluation <= alpha:
+            flag = TT_UPPERBOUND
+        elif evaluation >= beta:
+            flag = TT_LOWERBOUND
+        else:
+            flag = TT_EXACT
+        # With preferFasterWin the eval depends on how far from the root the
+        # position was found. Store it as seen from the position itself, so it
+        # is right also when the position comes up at another ply or in the next search.
+        if self.preferFasterWin:
+            evaluation /= FASTER_WIN_DISCOUNT ** ply
+        self.transpositionTable.store(ttKey, depth, flag, evaluation, bestMove)
+
+    #"history" is the moves made to get to this node. It is one list for the
+    #whole search: a move is appended before going down into it and removed
+    #after. Only the bottom nodes make a copy of it, as a tuple, which is then
+    #passed up as the history of the best line.
     def minMaxAlphaBetaPruningWithHistory(self, depth, maximizingPlayer, alpha, beta, history=None):
         if history is None:
             historyToThisNode = [] # This is the root node.
@@ -334,8 +1197,7 @@ class GameAlgo:
         if depth == 0:
             #We're at the bottom node! Evaluate this node and return it up the tree.
             bottomEval = self.evalFunc_callback()
-            retDict = {KEY_EVAL: bottomEval, KEY_BESTMOVE: None, KEY_HISTORY: historyToThisNode}
-            return {KEY_EVAL: bottomEval, KEY_BESTMOVE: None, KEY_HISTORY: historyToThisNode}
+            return ResultH(bottomEval, None, tuple(historyToThisNode))
 
         #Don't need to read out list if depth == 0!!
         if maximizingPlayer:
@@ -343,40 +1205,45 @@ class GameAlgo:
         else:
             moveList = self.getListOfPossibleMovesAsMinimizer_callback()
 
-        if len(moveList) == 0:
+        if not moveList:
             bottomEval = self.evalFunc_callback()
-            retDict = {KEY_EVAL: bottomEval, KEY_BESTMOVE: None, KEY_HISTORY: historyToThisNode}
-            return {KEY_EVAL: bottomEval, KEY_BESTMOVE: None, KEY_HISTORY: historyToThisNode}
+            return ResultH(bottomEval, None, tuple(historyToThisNode))
+
+        # Local names for what is used for every move in the loops
+        search = self.minMaxAlphaBetaPruningWithHistory
+        addToHistory = historyToThisNode.append
 
         if maximizingPlayer:
-            evalMaxResult = {KEY_EVAL: self.MIN_EVAL-1, KEY_BESTMOVE: moveList[0], KEY_HISTORY: historyToThisNode}
+            makeMove = self.maximizerMoveFunc_callback
+            undoMove = self.maximizerUndoMoveFunc_callback
+            # Starting outside the eval range, the first move searched is always better.
+            # The first move is also the move to give if interrupted before any is searched.
+            evalMaxResult = ResultH(self.MIN_EVAL-1, moveList[0], None)
             for move in moveList:
 
                 if self.interruptFlag:
                     break
 
                 #Try a move
-                self.maximizerMoveFunc_callback(move)
+                makeMove(move)
 
-                historyToThisNode.append(move)
+                addToHistory(move)
 
                 # RECUR
-                evalResult = self.minMaxAlphaBetaPruningWithHistory(depth-1, False, alpha, beta, historyToThisNode.copy())
+                evalResult = search(depth-1, False, alpha, beta, historyToThisNode)
 
                 del historyToThisNode[-1]
 
                 #Remove token before next loop
-                self.maximizerUndoMoveFunc_callback(move)
+                undoMove(move)
 
                 # Is this move better?
-                if evalResult[KEY_EVAL] > evalMaxResult[KEY_EVAL]:
-                    evalMaxResult[KEY_EVAL] = evalResult[KEY_EVAL]
-                    evalMaxResult[KEY_BESTMOVE] = move
-                    evalMaxResult[KEY_HISTORY] = evalResult[KEY_HISTORY]
+                if evalResult.eval > evalMaxResult.eval:
+                    evalMaxResult = ResultH(evalResult.eval, move, evalResult.history)
 
                 #Is this move the best I know so far?
-                if evalMaxResult[KEY_EVAL] > alpha:
-                    alpha = evalMaxResult[KEY_EVAL]
+                if evalMaxResult.eval > alpha:
+                    alpha = evalMaxResult.eval
 
                 # Minimizer above me knows he can achieve "beta".
                 # "alpha" is what I as maximizer AT LEAST will
@@ -386,11 +1253,18 @@ class GameAlgo:
                 if beta <= alpha:
                     break
 
+            if evalMaxResult.history is None:
+                # No move was searched
+                evalMaxResult = evalMaxResult._replace(history=tuple(historyToThisNode))
             return evalMaxResult
 
         #Minimizer
         else:
-            evalMinResult = {KEY_EVAL: self.MAX_EVAL+1, KEY_BESTMOVE: moveList[0], KEY_HISTORY: historyToThisNode}
+            makeMove = self.minimizerMoveFunc_callback
+            undoMove = self.minimizerUndoMoveFunc_callback
+            # Starting outside the eval range, the first move searched is always better.
+            # The first move is also the move to give if interrupted before any is searched.
+            evalMinResult = ResultH(self.MAX_EVAL+1, moveList[0], None)
             for move in moveList:
 
                 if self.interruptFlag:
@@ -398,27 +1272,25 @@ class GameAlgo:
                     break
 
                 # Try a move
-                self.minimizerMoveFunc_callback(move)
+                makeMove(move)
 
-                historyToThisNode.append(move)
+                addToHistory(move)
 
                 # RECUR
-                evalResult = self.minMaxAlphaBetaPruningWithHistory(depth - 1, True, alpha, beta, historyToThisNode.copy())
+                evalResult = search(depth - 1, True, alpha, beta, historyToThisNode)
 
                 del historyToThisNode[-1]
 
                 # Remove token before next loop
-                self.minimizerUndoMoveFunc_callback(move)
+                undoMove(move)
 
                 # Is this move better?
-                if evalResult[KEY_EVAL] < evalMinResult[KEY_EVAL]:
-                    evalMinResult[KEY_EVAL] = evalResult[KEY_EVAL]
-                    evalMinResult[KEY_BESTMOVE] = move
-                    evalMinResult[KEY_HISTORY] = evalResult[KEY_HISTORY]
+                if evalResult.eval < evalMinResult.eval:
+                    evalMinResult = ResultH(evalResult.eval, move, evalResult.history)
 
-                if evalMinResult[KEY_EVAL] < beta:
-                    evalMinResult[KEY_EVAL] = evalResult[KEY_EVAL]
-                    beta = evalMinResult[KEY_EVAL]
+                #Is this move the best I know so far?
+                if evalMinResult.eval < beta:
+                    beta = evalMinResult.eval
 
                 # Maximizer above me knows he can achieve "alpha".
                 # "beta" is what I as minimizer AT LEAST will
@@ -428,8 +1300,70 @@ class GameAlgo:
                 if beta <= alpha:
                     break
 
+            if evalMinResult.history is None:
+                # No move was searched
+                evalMinResult = evalMinResult._replace(history=tuple(historyToThisNode))
             return evalMinResult
 
 
+def _runOnDeepStack(depth, func, *args):
+    # Run func(*args) on a new thread with room for a depth deep recursion,
+    # and give back what it returns or raises. The calling thread waits, so
+    # interruptAnalyze must be called from another thread, as usual.
+    # func must be the search itself, not something that comes back here.
+    # Not thread-safe: the stack size and recursion limit are process-wide,
+    # and two of these at once could restore each other's limits too early.
+    result = []
+    error = []
+
+    def runner():
+        try:
+            result.append(func(*args))
+        except BaseException as e:
+            error.append(e)
+
+    oldRecursionLimit = sys.getrecursionlimit()
+    oldStackSize = threading.stack_size(DEEP_SEARCH_STACK_SIZE)
+    try:
+        sys.setrecursionlimit(oldRecursionLimit + depth * DEEP_SEARCH_FRAMES_PER_PLY)
+        thread = threading.Thread(target=runner, name=_DEEP_SEARCH_THREAD_NAME)
+        thread.start()
+        thread.join()
+    finally:
+        threading.stack_size(oldStackSize)
+        sys.setrecursionlimit(oldRecursionLimit)
+    if error:
+        raise error[0]
+    return result[0]
+
+
+# The interrupt event of the GameAlgo whose calculateMoveParallel started this worker process
+_workerInterrupt = None
+
+def _initWorker(interrupt):
+    global _workerInterrupt
+    _workerInterrupt = interrupt
+
+
+def _searchRootMoves(algo, whichAlgo, moves, maximizingPlayer, depth, alpha, beta):
+    # Run in a worker process by calculateMoveParallel. A thread passes an
+    # interruptAnalyze of the parent on to this copy of the GameAlgo.
+    done = threading.Event()
+
+    def passInterrupt():
+        while not done.is_set():
+            if _workerInterrupt.wait(WORKER_INTERRUPT_POLL):
+                algo.interruptAnalyze()
+                return
+
+    watcher = threading.Thread(target=passInterrupt, daemon=True)
+    watcher.start()
+    try:
+        return algo.searchRootMoves(whichAlgo, moves, maximizingPlayer, depth, alpha, beta)
+    finally:
+        done.set()
+        watcher.join()
+
+
 if __name__ == '__main__':
     print("MinMaxAlgo run from a commandprompt. Not yet implemented.")
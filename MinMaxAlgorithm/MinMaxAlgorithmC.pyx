@@ -0,0 +1,177 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+
+"""
+# Alpha-beta search in C, for games given as a BitboardState (see Bitboard.py).
+#
+# The tree walk is a C function on a C struct holding the bitboards, so no
+# python code runs per node. Built by setup.py when Cython is installed.
+#
+# Usage:
+#
+#   state = BitboardState()
+#   algo = CGameAlgo(state)
+#   move = algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, True, 9)
+#
+#   CGameAlgo has the same calculateMove as GameAlgo. The position is read
+#   from the BitboardState at every call, so the game keeps using it as before.
+#
+# Note:
+#   The eval is always the win patterns of the BitboardState: winEval,
+#   -winEval or 0, and a position with an eval other than 0 is a finished game.
+#   Squares are int moves, as in BitboardState.
+#
+"""
+
+ctypedef unsigned long long bb_t
+
+cdef enum:
+    MAX_PATTERNS = 64
+
+cdef struct state_t:
+    bb_t boards[2]      # Index 0 is minimizer, 1 is maximizer
+    bb_t fullMask
+    int nPatterns
+    bb_t patterns[MAX_PATTERNS]
+    int winEval
+    int minEval
+    int maxEval
+    int (*evaluate)(state_t* s) noexcept nogil
+
+# Index of the lowest set bit, which must be given. GCC and clang have a
+# builtin for it, MSVC an intrinsic. Other compilers get a de Bruijn lookup:
+# the lowest bit times the de Bruijn number has a different top 6 bits for
+# every bit index.
+cdef extern from *:
+    """
+    #if defined(__GNUC__) || defined(__clang__)
+    static int lowestBitIndex(unsigned long long x) { return __builtin_ctzll(x); }
+    #elif defined(_MSC_VER) && (defined(_M_X64) || defined(_M_ARM64))
+    #include <intrin.h>
+    static int lowestBitIndex(unsigned long long x) {
+        unsigned long index;
+        _BitScanForward64(&index, x);
+        return (int)index;
+    }
+    #else
+    static const int lowestBitIndexTable[64] = {
+        0, 1, 48, 2, 57, 49, 28, 3, 61, 58, 50, 42, 38, 29, 17, 4,
+        62, 55, 59, 36, 53, 51, 43, 22, 45, 39, 33, 30, 24, 18, 12, 5,
+        63, 47, 56, 27, 60, 41, 37, 16, 54, 35, 52, 21, 44, 32, 23, 11,
+        46, 26, 40, 15, 34, 20, 31, 10, 25, 14, 19, 9, 13, 8, 7, 6};
+    static int lowestBitIndex(unsigned long long x) {
+        return lowestBitIndexTable[((x & (0ULL - x)) * 0x03F79D71B4CB0A89ULL) >> 58];
+    }
+    #endif
+    """
+    int lowestBitIndex(unsigned long long x) nogil
+
+
+cdef int evaluateWinPatterns(state_t* s) noexcept nogil:
+    cdef int i
+    cdef bb_t pattern
+    for i in range(s.nPatterns):
+        pattern = s.patterns[i]
+        if s.boards[1] & pattern == pattern:
+            return s.winEval
+        if s.boards[0] & pattern == pattern:
+            return -s.winEval
+    return 0
+
+
+cdef int alphabeta(state_t* s, int depth, int alpha, int beta, int maximizing, int* bestMove) noexcept nogil:
+    cdef int score = s.evaluate(s)
+    cdef int best
+    cdef int bestSoFar
+    cdef int move
+    cdef int childEval
+    cdef int childMove
+    cdef int better
+    cdef int sign
+    cdef bb_t empty
+    cdef bb_t lowestBit
+
+    bestMove[0] = -1
+    # Bottom node, or the game is won
+    if depth == 0 or score != 0:
+        return score
+    empty = ~(s.boards[0] | s.boards[1]) & s.fullMask
+    if empty == 0:
+        return score
+
+    # First move is the best if none is better than the limits
+    bestSoFar = lowestBitIndex(empty)
+    if maximizing:
+        best = s.minEval
+        sign = 1
+    else:
+        best = s.maxEval
+        sign = -1
+
+    while empty:
+        lowestBit = empty & (~empty + 1)
+        empty ^= lowestBit
+        move = lowestBitIndex(lowestBit)
+
+        #Try a move, recur and remove token again
+        s.boards[maximizing] ^= lowestBit
+        childEval = alphabeta(s, depth - 1, alpha, beta, not maximizing, &childMove)
+        s.boards[maximizing] ^= lowestBit
+
+        # Is this move better? Whether it is depends on the evals, which is hard
+        # to predict, so it is written as conditional moves (cmov) and not as a branch.
+        better = (childEval - best) * sign > 0
+        best = childEval if better else best
+        bestSoFar = move if better else bestSoFar
+
+        # Which player is in turn is the same for the whole loop, that branch is predicted.
+        if maximizing:
+            alpha = alpha if alpha > best else best
+        else:
+            beta = beta if beta < best else best
+
+        # Cutoffs are the common case and well predicted. Keep it a branch.
+        if beta <= alpha:
+            break
+
+    bestMove[0] = bestSoFar
+    return best
+
+
+cdef class CGameAlgo:
+
+    """
+    bitboardState - The BitboardState of the game. Its boards are read at every calculateMove.
+    minEval, maxEval, depth - As for GameAlgo.
+    """
+
+    cdef state_t state
+    cdef object bitboardState
+    cdef public int DEPTH
+
+    def __init__(self, bitboardState, minEval=-100, maxEval=100, depth=6):
+        if bitboardState.squares > 64 or len(bitboardState.winPatterns) > MAX_PATTERNS:
+            raise ValueError("CGameAlgo handles at most 64 squares and " + str(MAX_PATTERNS) + " win patterns")
+        self.bitboardState = bitboardState
+        self.state.fullMask = bitboardState.fullMask
+        self.state.nPatterns = len(bitboardState.winPatterns)
+        for i, pattern in enumerate(bitboardState.winPatterns):
+            self.state.patterns[i] = pattern
+        self.state.winEval = bitboardState.winEval
+        self.state.minEval = minEval
+        self.state.maxEval = maxEval
+        self.state.evaluate = evaluateWinPatterns
+        self.DEPTH = depth
+
+    def calculateMove(self, whichAlgo, maximizingPlayer, depth):
+        # Every algo gives the best move, so all of them are done as alpha-beta.
+        cdef int bestMove
+        cdef int searchDepth = depth
+        cdef int maximizing = 1 if maximizingPlayer else 0
+        cdef state_t* s = &self.state
+        s.boards[0] = self.bitboardState.minimizerBoard
+        s.boards[1] = self.bitboardState.maximizerBoard
+        with nogil:
+            alphabeta(s, searchDepth, s.minEval, s.maxEval, maximizing, &bestMove)
+        if bestMove < 0:
+            return None
+        return bestMove
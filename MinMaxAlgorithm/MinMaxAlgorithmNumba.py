@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+
+"""
+# Compiled alpha-beta search for games whose state fits in a numpy array,
+# e.g. a Tic-Tac-Toe board as 9 int8 or a Connect-4 board as 42 int8.
+#
+# With the game written as Numba functions the whole tree walk is compiled,
+# which is an order of magnitude faster than calling python callbacks.
+#
+# Usage:
+#
+#   Write the callbacks as @numba.njit functions working on the board array:
+#       evalFunc(board) -> eval
+#       movesFunc(board, maximizingPlayer, moveBuffer) -> number of moves written to moveBuffer
+#       moveFunc(board, move, maximizingPlayer)
+#       undoFunc(board, move, maximizingPlayer)
+#
+#   Create an NjitMinimax with them and give it to GameAlgo as "njitMinimax".
+#   GameAlgo.minimaxNjit(board, depth, maximizingPlayer) then searches with it.
+#
+# Note:
+#   numba and numpy are only needed when this module is used. Without numba
+#   the search runs as plain python.
+#
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+# Where the search keeps each node on the way down to the current one. Row n
+# of the frame arrays is the node n moves from the root.
+_FRAME_BEST = 0         # frameEvals: best eval so far
+_FRAME_ALPHA = 1        # frameEvals: alpha
+_FRAME_BETA = 2         # frameEvals: beta
+_FRAME_COUNT = 0        # frameInts: number of moves
+_FRAME_NEXT = 1         # frameInts: index of the next move to try
+_FRAME_BESTMOVE = 2     # frameInts: best move so far
+
+
+def _makeSearch(evalFunc, movesFunc, moveFunc, undoFunc):
+    # Alpha-beta search written as a loop over an explicit stack of frames.
+    # Numba compiles a loop much better than a recursive function, and with
+    # the frames in preallocated arrays nothing is allocated per node.
+    # The callbacks are used as constants, so when compiled there is no
+    # dynamic dispatch left in the tree walk.
+
+    def search(board, depth, maximizingPlayer, alpha, beta, minEval, maxEval,
+               moveBuffers, frameEvals, frameInts):
+        level = 0
+        entering = True
+        childEval = 0.0
+        while True:
+            maximizing = maximizingPlayer if level % 2 == 0 else not maximizingPlayer
+
+            if entering:
+                # Every level has its own row in the move buffer, no list per node.
+                count = 0
+                if level < depth:
+                    count = movesFunc(board, maximizing, moveBuffers[level])
+                if count == 0:
+                    # Bottom node, or no moves. Evaluate and give it to the node above.
+                    childEval = float(evalFunc(board))
+                    if level == 0:
+                        return childEval, np.int64(-1)
+                    level -= 1
+                    entering = False
+                    continue
+                frameInts[level, _FRAME_COUNT] = count
+                frameInts[level, _FRAME_NEXT] = 0
+                frameInts[level, _FRAME_BESTMOVE] = moveBuffers[level, 0]
+                frameEvals[level, _FRAME_BEST] = minEval if maximizing else maxEval
+                frameEvals[level, _FRAME_ALPHA] = alpha
+                frameEvals[level, _FRAME_BETA] = beta
+            else:
+                # Back from the move tried last. Take it back and see if it was better.
+                move = moveBuffers[level, frameInts[level, _FRAME_NEXT] - 1]
+                undoFunc(board, move, maximizing)
+                if maximizing:
+                    if childEval > frameEvals[level, _FRAME_BEST]:
+                        frameEvals[level, _FRAME_BEST] = childEval
+                        frameInts[level, _FRAME_BESTMOVE] = move
+                    if frameEvals[level, _FRAME_BEST] > frameEvals[level, _FRAME_ALPHA]:
+                        frameEvals[level, _FRAME_ALPHA] = frameEvals[level, _FRAME_BEST]
+                else:
+                    if childEval < frameEvals[level, _FRAME_BEST]:
+                        frameEvals[level, _FRAME_BEST] = childEval
+                        frameInts[level, _FRAME_BESTMOVE] = move
+                    if frameEvals[level, _FRAME_BEST] < frameEvals[level, _FRAME_BETA]:
+                        frameEvals[level, _FRAME_BETA] = frameEvals[level, _FRAME_BEST]
+                if frameEvals[level, _FRAME_BETA] <= frameEvals[level, _FRAME_ALPHA]:
+                    # Cutoff. No more moves to try here.
+                    frameInts[level, _FRAME_NEXT] = frameInts[level, _FRAME_COUNT]
+
+            nextMove = frameInts[level, _FRAME_NEXT]
+            if nextMove == frameInts[level, _FRAME_COUNT]:
+                # This node is done
+                childEval = frameEvals[level, _FRAME_BEST]
+                if level == 0:
+                    return childEval, np.int64(frameInts[0, _FRAME_BESTMOVE])
+                level -= 1
+                entering = False
+                continue
+
+            #Try a move and go down into it
+            move = moveBuffers[level, nextMove]
+            frameInts[level, _FRAME_NEXT] = nextMove + 1
+            moveFunc(board, move, maximizing)
+            alpha = frameEvals[level, _FRAME_ALPHA]
+            beta = frameEvals[level, _FRAME_BETA]
+            level += 1
+            entering = True
+
+    return search
+
+
+def _isCompiled(func):
+    # Numba dispatchers keep the python function they were made from
+    return hasattr(func, 'py_func')
+
+
+class NjitMinimax:
+
+    """
+    evalFunc, movesFunc, moveFunc, undoFunc - The njit compiled game callbacks, see above.
+    maxMoves - Most moves movesFunc can write into its buffer.
+    maxDepth - Deepest search that will be asked for.
+    warmupBoard - Optional board to compile the search with right away, so that the
+                  compile time is not paid at the first move of a game.
+
+    If numba is not installed, or the callbacks are plain python functions, the
+    same search runs as python. Slow, but handy for testing the callbacks.
+    """
+
+    def __init__(self, evalFunc, movesFunc, moveFunc, undoFunc, maxMoves, maxDepth, warmupBoard=None):
+        if np is None:
+            raise ImportError("NjitMinimax needs numpy")
+        search = _makeSearch(evalFunc, movesFunc, moveFunc, undoFunc)
+        callbacks = (evalFunc, movesFunc, moveFunc, undoFunc)
+        if njit is not None and all(_isCompiled(func) for func in callbacks):
+            search = njit(search)
+        self.search = search
+        self.maxDepth = maxDepth
+        self.moveBuffers = np.empty((maxDepth + 1, maxMoves), np.int32)
+        self.frameEvals = np.empty((maxDepth + 1, 3), np.float64)
+        self.frameInts = np.empty((maxDepth + 1, 3), np.int64)
+        if warmupBoard is not None:
+            self(warmupBoard.copy(), 1, True, 0, 0, 0, 0)
+
+    def __call__(self, board, depth, maximizingPlayer, alpha, beta, minEval, maxEval):
+        if depth > self.maxDepth:
+            raise ValueError("depth " + str(depth) + " is deeper than maxDepth " + str(self.maxDepth))
+        bestEval, bestMove = self.search(board, depth, maximizingPlayer, float(alpha), float(beta),
+                                         float(minEval), float(maxEval),
+                                         self.moveBuffers, self.frameEvals, self.frameInts)
+        # Plain python numbers, also from the search run as python
+        if bestMove < 0:
+            return (float(bestEval), None)
+        return (float(bestEval), int(bestMove))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+"""
+# Transposition table stored in one contiguous numpy array.
+#
+# Same use as TranspositionTable in MinMaxAlgorithm.py, but every entry is a
+# 16 byte record, four to a 64 byte cache line, and the two slots of a bucket
+# lie next to each other. A probe reads one cache line instead of following
+# pointers through python objects. Most useful together with compiled search
+# code that reads the array directly; from python every record access is slow.
+#
+# Usage:
+#
+#   algo = GameAlgo(..., zobristHash_callback=hashFunc,
+#                   transpositionTable=NumpyTranspositionTable(1 << 20))
+#
+# Note:
+#   Evals must be ints that fit in int16, moves ints that fit in int16 and
+#   depths at most 127. store raises ValueError for anything else, instead of
+#   keeping a truncated value. So it can not be used with preferFasterWin,
+#   which makes the evals floats.
+#   numpy is only needed when this module is used.
+#
+"""
+from numbers import Integral
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if np is not None:
+    # 8 + 2 + 1 + 1 + 2 + 2 = 16 bytes
+    TT_ENTRY_DTYPE = np.dtype([('key', np.uint64),
+                               ('eval', np.int16),
+                               ('depth', np.int8),
+                               ('flag', np.int8),
+                               ('bestMove', np.int16),
+                               ('generation', np.uint16)])
+
+_KEY_MASK = (1 << 64) - 1
+# Set in the flag field of entries that have a best move. Every int16 is a
+# legal move, so no bestMove value can be kept free to mean "none".
+_HAS_BESTMOVE = 4
+_FLAG_MASK = _HAS_BESTMOVE - 1
+_EMPTY_DEPTH = -1
+_MAX_DEPTH = 127
+_INT16_MIN = -(1 << 15)
+_INT16_MAX = (1 << 15) - 1
+
+def _isInt16(value):
+    return isinstance(value, Integral) and _INT16_MIN <= value <= _INT16_MAX
+
+class NumpyTranspositionTable:
+
+    """
+    size - Number of entries. Rounded to a power of two number of buckets with two slots each.
+
+    Uses the same replacement as TranspositionTable: the first slot of a bucket keeps
+    the deepest entry of the current search, the second always takes the newest entry.
+    probe returns entries as tuples with the same fields as TranspositionTable.
+    """
+
+    __slots__ = ('size', 'mask', 'table', 'generation')
+
+    # The evals are stored as int16. GameAlgo checks this for preferFasterWin.
+    storesFloatEvals = False
+
+    def __init__(self, size):
+        if np is None:
+            raise ImportError("NumpyTranspositionTable needs numpy")
+        buckets = 1 << max(size // 2 - 1, 0).bit_length()
+        self.size = 2 * buckets
+        self.mask = buckets - 1
+        self.table = np.zeros((buckets, 2), dtype=TT_ENTRY_DTYPE)
+        self.table['depth'] = _EMPTY_DEPTH
+        self.generation = 0
+
+    def newSearch(self):
+        self.generation = (self.generation + 1) & 0xFFFF
+
+    def probe(self, key):
+        key &= _KEY_MASK
+        bucket = self.table[key & self.mask]
+        for entry in bucket:
+            if entry['depth'] != _EMPTY_DEPTH and int(entry['key']) == key:
+                flag = int(entry['flag'])
+                return (key, int(entry['depth']), flag & _FLAG_MASK, int(entry['eval']),
+                        int(entry['bestMove']) if flag & _HAS_BESTMOVE else None, int(entry['generation']))
+        return None
+
+    def store(self, key, depth, flag, evaluation, bestMove):
+        if not _isInt16(evaluation) or not (bestMove is None or _isInt16(bestMove)) or depth > _MAX_DEPTH:
+            raise ValueError("NumpyTranspositionTable stores int16 evals and moves and depths up to "
+                             + str(_MAX_DEPTH) + ", got eval " + repr(evaluation) + ", move "
+                             + repr(bestMove) + ", depth " + str(depth))
+        key &= _KEY_MASK
+        bucket = self.table[key & self.mask]
+        deepEntry = bucket[0]
+        if (deepEntry['depth'] == _EMPTY_DEPTH or int(deepEntry['key']) == key
+                or depth >= deepEntry['depth'] or deepEntry['generation'] != self.generation):
+            slot = 0
+        else:
+            slot = 1
+        if bestMove is None:
+            bucket[slot] = (key, evaluation, depth, flag, 0, self.generation)
+        else:
+            bucket[slot] = (key, evaluation, depth, flag | _HAS_BESTMOVE, bestMove, self.generation)
+
+    def clear(self):
+        self.table[:] = 0
+        self.table['depth'] = _EMPTY_DEPTH
+        self.generation = 0
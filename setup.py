@@ -1,4 +1,28 @@
-from setuptools import setup
+from setuptools import setup, Extension
+from setuptools.command.build_ext import build_ext
+
+# Optimization flags by compiler type. Others build with their defaults.
+OPTIMIZE_ARGS = {'unix': ['-O3'], 'mingw32': ['-O3'], 'msvc': ['/O2']}
+
+class OptimizingBuildExt(build_ext):
+
+    # The compiler is only known when building, so the flags are set here.
+    def build_extensions(self):
+        for extension in self.extensions:
+            extension.extra_compile_args = OPTIMIZE_ARGS.get(self.compiler.compiler_type, [])
+        build_ext.build_extensions(self)
+
+# The C version of the search is only built when Cython is installed. It is
+# optional: without a working C compiler the package installs as pure python.
+try:
+    from Cython.Build import cythonize
+    ext_modules = cythonize([Extension('MinMaxAlgorithm.MinMaxAlgorithmC',
+                                       ['MinMaxAlgorithm/MinMaxAlgorithmC.pyx'])])
+    # Set on what cythonize gives back, it does not keep "optional"
+    for extension in ext_modules:
+        extension.optional = True
+except ImportError:
+    ext_modules = []
 
 setup(name='MinMaxAlgorithm',
       version='1.0.1',
@@ -8,4 +32,7 @@ setup(name='MinMaxAlgorithm',
       author_email='helgemod@gmail.com',
       license='MIT',
       packages=['MinMaxAlgorithm'],
-      zip_safe=False)
\ No newline at end of file
+      ext_modules=ext_modules,
+      cmdclass={'build_ext': OptimizingBuildExt},
+      extras_require={'numba': ['numba', 'numpy'], 'numpy': ['numpy']},
+      zip_safe=False)
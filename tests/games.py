@@ -0,0 +1,241 @@
+"""
+# Small games for the tests, and a plain recursive minimax that the
+# searches of GameAlgo are checked against.
+"""
+
+import random
+
+from MinMaxAlgorithm.MinMaxAlgorithm import GameAlgo, FASTER_WIN_DISCOUNT
+from MinMaxAlgorithm.Bitboard import BitboardState
+
+
+def ticTacToe(maximizerSquares=(), minimizerSquares=()):
+    state = BitboardState()
+    for square in maximizerSquares:
+        state.maximizerMove(square)
+    for square in minimizerSquares:
+        state.minimizerMove(square)
+    return state
+
+
+# Every move loses for maximizer (X): O has two ways to get three in a row.
+#   . X .
+#   . O O
+#   . X .
+def lostTicTacToe():
+    return ticTacToe((1, 7), (4, 5))
+
+
+def randomTicTacToe(rnd):
+    # A position from a random game stopped after a few moves, and who is in turn
+    state = BitboardState()
+    maximizingPlayer = True
+    for _ in range(rnd.randrange(3, 8)):
+        possibleMoves = state.possibleMoves()
+        if not possibleMoves:
+            break
+        if maximizingPlayer:
+            state.maximizerMove(rnd.choice(possibleMoves))
+        else:
+            state.minimizerMove(rnd.choice(possibleMoves))
+        maximizingPlayer = not maximizingPlayer
+    return state, maximizingPlayer
+
+
+class RandomTreeGame:
+
+    """
+    A game with random evals, where the same position comes up through
+    different move orders. A position is the set of moves made by each side,
+    so it does not matter in which order they were made.
+    moveCount - Number of different moves. A move can only be made once.
+    branching - At most this many moves in a position.
+    """
+
+    def __init__(self, seed=0, moveCount=8, branching=4):
+        rnd = random.Random(seed)
+        self.keys = ([rnd.getrandbits(64) for _ in range(moveCount)],
+                     [rnd.getrandbits(64) for _ in range(moveCount)])
+        self.moveCount = moveCount
+        self.branching = branching
+        self.key = 0
+        self.madeMoves = []
+
+    def evaluate(self):
+        return random.Random(self.key).randint(-50, 50)
+
+    def possibleMoves(self):
+        # Now and then a position where the game is over
+        if len(self.madeMoves) >= 2 and self.key % 11 == 0:
+            return []
+        moves = [move for move in range(self.moveCount) if move not in self.madeMoves]
+        random.Random(self.key).shuffle(moves)
+        return moves[:self.branching]
+
+    def noisyMoves(self, maximizingPlayer):
+        # Some of the moves, to have something for the quiescence search
+        return [move for move in self.possibleMoves() if move % 3 == 0]
+
+    def maximizerMove(self, move):
+        self.key ^= self.keys[0][move]
+        self.madeMoves.append(move)
+
+    def minimizerMove(self, move):
+        self.key ^= self.keys[1][move]
+        self.madeMoves.append(move)
+
+    def maximizerUndoMove(self, move):
+        assert self.madeMoves.pop() == move
+        self.key ^= self.keys[0][move]
+
+    def minimizerUndoMove(self, move):
+        assert self.madeMoves.pop() == move
+        self.key ^= self.keys[1][move]
+
+    def hash(self):
+        return self.key
+
+    def writePossibleMoves(self, moveBuffer):
+        moves = self.possibleMoves()
+        for i, move in enumerate(moves):
+            moveBuffer[i] = move
+        return len(moves)
+
+    def algo(self, evalFunc=None, **kwargs):
+        kwargs.setdefault('depth', 5)
+        return GameAlgo(evalFunc or self.evaluate,
+                        self.maximizerMove, self.minimizerMove,
+                        self.maximizerUndoMove, self.minimizerUndoMove,
+                        self.possibleMoves, self.possibleMoves,
+                        **kwargs)
+
+
+class CorridorGame:
+
+    """
+    A game that is "length" moves long. Every move but the last two is
+    forced, so a full search is as deep as the game but still small.
+    Used for searches deeper than the python stack allows.
+    """
+
+    def __init__(self, length):
+        self.length = length
+        self.madeMoves = []
+
+    def evaluate(self):
+        return sum(self.madeMoves[-2:]) if len(self.madeMoves) == self.length else 0
+
+    def possibleMoves(self):
+        movesLeft = self.length - len(self.madeMoves)
+        if movesLeft == 0:
+            return []
+        if movesLeft <= 2:
+            return [-3, 1, 2]
+        return [0]
+
+    def move(self, move):
+        self.madeMoves.append(move)
+
+    def undoMove(self, move):
+        assert self.madeMoves.pop() == move
+
+    def algo(self, **kwargs):
+        return GameAlgo(self.evaluate, self.move, self.move, self.undoMove, self.undoMove,
+                        self.possibleMoves, self.possibleMoves, **kwargs)
+
+
+def referenceMinimax(algo, depth, maximizingPlayer, preferFasterWin=False, ply=0):
+    # The eval of the position, by trying every move to the depth given.
+    # Uses the callbacks of algo but none of its search code.
+    if maximizingPlayer:
+        moveList = algo.getListOfPossibleMovesAsMaximizer_callback()
+        makeMove = algo.maximizerMoveFunc_callback
+        undoMove = algo.maximizerUndoMoveFunc_callback
+    else:
+        moveList = algo.getListOfPossibleMovesAsMinimizer_callback()
+        makeMove = algo.minimizerMoveFunc_callback
+        undoMove = algo.minimizerUndoMoveFunc_callback
+    if depth == 0 or not moveList:
+        bottomEval = algo.evalFunc_callback()
+        if preferFasterWin:
+            bottomEval *= FASTER_WIN_DISCOUNT ** ply
+        return bottomEval
+    evals = []
+    for move in list(moveList):
+        makeMove(move)
+        evals.append(referenceMinimax(algo, depth - 1, not maximizingPlayer, preferFasterWin, ply + 1))
+        undoMove(move)
+    return max(evals) if maximizingPlayer else min(evals)
+
+
+def referenceQuiescence(game, depth, quiescenceDepth, maximizingPlayer):
+    # Plain minimax that goes on with the noisy moves below depth 0. There
+    # the player in turn may also take the eval as it is (stand pat).
+    # For a RandomTreeGame, which has the noisy moves.
+    if depth > 0:
+        moveList = game.possibleMoves()
+    elif quiescenceDepth > 0:
+        moveList = game.noisyMoves(maximizingPlayer)
+    else:
+        moveList = []
+    if not moveList:
+        return game.evaluate()
+    evals = [game.evaluate()] if depth == 0 else []
+    for move in moveList:
+        if maximizingPlayer:
+            game.maximizerMove(move)
+        else:
+            game.minimizerMove(move)
+        if depth > 0:
+            evals.append(referenceQuiescence(game, depth - 1, quiescenceDepth, not maximizingPlayer))
+        else:
+            evals.append(referenceQuiescence(game, 0, quiescenceDepth - 1, not maximizingPlayer))
+        if maximizingPlayer:
+            game.maximizerUndoMove(move)
+        else:
+            game.minimizerUndoMove(move)
+    return max(evals) if maximizingPlayer else min(evals)
+
+
+def referenceMoveEvals(algo, depth, maximizingPlayer, preferFasterWin=False):
+    # Dict with the eval of every move in the position
+    if maximizingPlayer:
+        moveList = algo.getListOfPossibleMovesAsMaximizer_callback()
+        makeMove = algo.maximizerMoveFunc_callback
+        undoMove = algo.maximizerUndoMoveFunc_callback
+    else:
+        moveList = algo.getListOfPossibleMovesAsMinimizer_callback()
+        makeMove = algo.minimizerMoveFunc_callback
+        undoMove = algo.minimizerUndoMoveFunc_callback
+    moveEvals = {}
+    for move in list(moveList):
+        makeMove(move)
+        moveEvals[move] = referenceMinimax(algo, depth - 1, not maximizingPlayer, preferFasterWin, 1)
+        undoMove(move)
+    return moveEvals
+
+
+def referenceBestMoves(algo, depth, maximizingPlayer, preferFasterWin=False):
+    # All the moves that are as good as the best one
+    moveEvals = referenceMoveEvals(algo, depth, maximizingPlayer, preferFasterWin)
+    best = max(moveEvals.values()) if maximizingPlayer else min(moveEvals.values())
+    return [move for move, moveEval in moveEvals.items() if moveEval == best]
+
+
+class InterruptAfter:
+
+    """
+    An eval callback that calls interruptAnalyze on its algo after it has
+    been called "calls" times, as when the user stops the analysis.
+    """
+
+    def __init__(self, evalFunc, calls):
+        self.evalFunc = evalFunc
+        self.calls = calls
+        self.algo = None
+
+    def __call__(self):
+        self.calls -= 1
+        if self.calls == 0:
+            self.algo.interruptAnalyze()
+        return self.evalFunc()
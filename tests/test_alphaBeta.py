@@ -0,0 +1,224 @@
+import pickle
+import random
+import unittest
+
+from MinMaxAlgorithm.MinMaxAlgorithm import GameAlgo, MINMAXALPHABETAPRUNING_ALGO
+
+from tests.games import (ticTacToe, lostTicTacToe, RandomTreeGame, InterruptAfter,
+                         referenceMinimax, referenceMoveEvals, referenceBestMoves)
+
+
+# The ways the alpha-beta search can be set up, all giving the same evals
+SEARCHES = ({'moveOrderingHeuristics': True},
+            {'hashed': True},
+            {'hashed': True, 'moveOrderingHeuristics': True},
+            {'hashed': True, 'cacheMoveLists': True})
+
+
+class MoveCountingGame(RandomTreeGame):
+
+    """
+    RandomTreeGame that remembers the position of every call to possibleMoves.
+    """
+
+    def __init__(self, seed):
+        RandomTreeGame.__init__(self, seed)
+        self.moveCalls = []
+
+    def possibleMoves(self):
+        self.moveCalls.append(self.key)
+        return RandomTreeGame.possibleMoves(self)
+
+
+def searchAlgo(game, hashed=False, **kwargs):
+    if hashed:
+        kwargs['zobristHash_callback'] = game.hash
+    return game.algo(**kwargs)
+
+
+class AlphaBetaTest(unittest.TestCase):
+
+    def testEvalAsReference(self):
+        for seed in range(15):
+            for kwargs in SEARCHES:
+                game = RandomTreeGame(seed)
+                algo = searchAlgo(game, **kwargs)
+                for maximizingPlayer in (True, False):
+                    expected = referenceMinimax(algo, 5, maximizingPlayer)
+                    result = algo.minMaxAlphaBetaPruning(5, maximizingPlayer, algo.MIN_EVAL, algo.MAX_EVAL)
+                    self.assertEqual(result.eval, expected, (seed, kwargs))
+                    self.assertEqual(game.madeMoves, [])
+
+    def testBestMoveAsReference(self):
+        for seed in range(15):
+            for kwargs in SEARCHES:
+                game = RandomTreeGame(seed)
+                algo = searchAlgo(game, **kwargs)
+                for maximizingPlayer in (True, False):
+                    bestMoves = referenceBestMoves(algo, 5, maximizingPlayer)
+                    self.assertIn(algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, maximizingPlayer, 5), bestMoves)
+
+    def testWindow(self):
+        # Fail-soft: an eval outside the window is only a bound, on the right side of it.
+        # This is what the null window tests of principal variation search rely on.
+        rnd = random.Random(4)
+        for seed in range(15):
+            for kwargs in SEARCHES:
+                game = RandomTreeGame(seed)
+                algo = searchAlgo(game, **kwargs)
+                for maximizingPlayer in (True, False):
+                    expected = referenceMinimax(algo, 5, maximizingPlayer)
+                    alpha = rnd.randint(-60, 40)
+                    beta = alpha + rnd.choice((1, 2, 10, 50))
+                    resultEval = algo.minMaxAlphaBetaPruning(5, maximizingPlayer, alpha, beta).eval
+                    if expected <= alpha:
+                        self.assertLessEqual(resultEval, alpha)
+                        self.assertGreaterEqual(resultEval, expected)
+                    elif expected >= beta:
+                        self.assertGreaterEqual(resultEval, beta)
+                        self.assertLessEqual(resultEval, expected)
+                    else:
+                        self.assertEqual(resultEval, expected)
+
+    def testAspirationWindow(self):
+        for seed in range(15):
+            for window in (1, 5, 30):
+                game = RandomTreeGame(seed)
+                algo = searchAlgo(game, hashed=True, aspirationWindow=window)
+                for maximizingPlayer in (True, False):
+                    expected = referenceMinimax(algo, 5, maximizingPlayer)
+                    self.assertIn(algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, maximizingPlayer, 5),
+                                  referenceBestMoves(algo, 5, maximizingPlayer))
+                    # Whatever eval is expected, the window is widened until the right one is found
+                    for expectedEval in (expected - 40, expected, expected + 3, expected + 40):
+                        algo.startSearch()
+                        self.assertEqual(algo.aspirationSearch(5, maximizingPlayer, expectedEval).eval, expected)
+
+    def testMoveListsCached(self):
+        # With cacheMoveLists the move list of a position is read once per search,
+        # however often the position comes up again.
+        for seed in range(10):
+            callCounts = []
+            for cacheMoveLists in (False, True):
+                game = MoveCountingGame(seed)
+                algo = searchAlgo(game, hashed=True, cacheMoveLists=cacheMoveLists)
+                bestMoves = referenceBestMoves(algo, 5, True)
+                game.moveCalls = []
+                self.assertIn(algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, True, 5), bestMoves)
+                callCounts.append(len(game.moveCalls))
+            # A key is only ever the same position with the same player in turn
+            self.assertEqual(len(game.moveCalls), len(set(game.moveCalls)), seed)
+            self.assertLess(callCounts[1], callCounts[0], seed)
+
+    def testAspirationWindowMustBePositive(self):
+        game = RandomTreeGame()
+        for window in (0, -5):
+            with self.assertRaises(ValueError):
+                searchAlgo(game, hashed=True, aspirationWindow=window)
+
+    def testTranspositionTableKeptBetweenMoves(self):
+        # A second search of the same position gets its evals from the table
+        game = RandomTreeGame(5)
+        algo = searchAlgo(game, hashed=True)
+        expected = referenceMinimax(algo, 5, True)
+        for _ in range(2):
+            self.assertEqual(algo.minMaxAlphaBetaPruning(5, True, algo.MIN_EVAL, algo.MAX_EVAL).eval, expected)
+        algo.newGame()
+        self.assertEqual(algo.minMaxAlphaBetaPruning(5, True, algo.MIN_EVAL, algo.MAX_EVAL).eval, expected)
+
+    def testTableOnlyWithHash(self):
+        # Without a hash the table could never be used, and none is made. Also not in a copy.
+        game = RandomTreeGame()
+        for hashed in (False, True):
+            algo = searchAlgo(game, hashed=hashed)
+            copy = pickle.loads(pickle.dumps(algo))
+            for tableAlgo in (algo, copy):
+                self.assertEqual(tableAlgo.transpositionTable is not None, hashed)
+                tableAlgo.newGame()
+                self.assertIn(tableAlgo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, True, 5),
+                              referenceBestMoves(algo, 5, True))
+
+    def testHistoryScoresAged(self):
+        # Every new search halves the history scores, and drops those that would get to 0
+        game = RandomTreeGame(3)
+        algo = searchAlgo(game, moveOrderingHeuristics=True)
+        algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, True, 5)
+        scores = dict(algo.historyScores)
+        self.assertTrue(scores)
+        algo.startSearch()
+        self.assertEqual(algo.historyScores, {key: score // 2 for key, score in scores.items() if score > 1})
+        algo.historyScores = {(True, 1): 9, (True, 2): 1, (False, 1): 2, (False, 3): 1}
+        algo.startSearch()
+        self.assertEqual(algo.historyScores, {(True, 1): 4, (False, 1): 1})
+        algo.startSearch()
+        self.assertEqual(algo.historyScores, {(True, 1): 2})
+        algo.newGame()
+        self.assertEqual(algo.historyScores, {})
+
+    def testPreferFasterWin(self):
+        for seed in range(10):
+            for kwargs in SEARCHES:
+                game = RandomTreeGame(seed)
+                algo = searchAlgo(game, preferFasterWin=True, **kwargs)
+                for maximizingPlayer in (True, False):
+                    expected = referenceMinimax(algo, 5, maximizingPlayer, preferFasterWin=True)
+                    result = algo.minMaxAlphaBetaPruning(5, maximizingPlayer, algo.MIN_EVAL, algo.MAX_EVAL)
+                    self.assertAlmostEqual(result.eval, expected)
+
+    def testPreferFasterWinTableKeptBetweenMoves(self):
+        # The entries of the first search are found again two plies nearer the root.
+        # Their evals must be discounted from there, not from where they were stored.
+        for seed in range(10):
+            game = RandomTreeGame(seed)
+            algo = searchAlgo(game, hashed=True, preferFasterWin=True)
+            algo.minMaxAlphaBetaPruning(5, True, algo.MIN_EVAL, algo.MAX_EVAL)
+            firstMove, secondMove = game.possibleMoves()[:2]
+            game.maximizerMove(firstMove)
+            game.minimizerMove(secondMove)
+            if game.possibleMoves():
+                result = algo.minMaxAlphaBetaPruning(3, True, algo.MIN_EVAL, algo.MAX_EVAL)
+                self.assertAlmostEqual(result.eval, referenceMinimax(algo, 3, True, preferFasterWin=True))
+                moveEvals = referenceMoveEvals(algo, 3, True, preferFasterWin=True)
+                self.assertAlmostEqual(moveEvals[result.bestMove], max(moveEvals.values()))
+            game.minimizerUndoMove(secondMove)
+            game.maximizerUndoMove(firstMove)
+
+    def testFasterWinIsPicked(self):
+        # X wins at once on square 8. Square 2, searched first, wins two moves later.
+        state = ticTacToe((0, 4), (1, 3))
+        for hashed in (False, True):
+            algo = GameAlgo.fromBitboardState(state, zobristHash_callback=state.hash if hashed else None)
+            self.assertIn(algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, True, 9), (2, 8))
+            algo = GameAlgo.fromBitboardState(state, preferFasterWin=True,
+                                              zobristHash_callback=state.hash if hashed else None)
+            self.assertEqual(algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, True, 9), 8)
+
+    def testLostPositionGivesAMove(self):
+        for kwargs in ({'moveOrderingHeuristics': True}, {}):
+            state = lostTicTacToe()
+            algo = GameAlgo.fromBitboardState(state, **kwargs)
+            self.assertIn(algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, True, 9), state.possibleMoves())
+
+    def testGameOverGivesNoMove(self):
+        state = ticTacToe((0, 1, 2), (4, 5))
+        for kwargs in ({'moveOrderingHeuristics': True}, {}):
+            algo = GameAlgo.fromBitboardState(state, **kwargs)
+            self.assertIsNone(algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, False, 9))
+
+    def testInterruptGivesAMove(self):
+        for calls in (1, 5, 50, 500):
+            for kwargs in SEARCHES:
+                game = RandomTreeGame(6)
+                evalFunc = InterruptAfter(game.evaluate, calls)
+                algo = searchAlgo(game, evalFunc=evalFunc, **kwargs)
+                evalFunc.algo = algo
+                move = algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, True, 5)
+                self.assertIn(move, game.possibleMoves())
+                self.assertEqual(game.madeMoves, [])
+                # The next search is not interrupted, and not misled by the interrupted one
+                self.assertIn(algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, True, 5),
+                              referenceBestMoves(algo, 5, True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import random
+import unittest
+
+from MinMaxAlgorithm.MinMaxAlgorithm import GameAlgo
+
+from tests.games import ticTacToe, lostTicTacToe, randomTicTacToe, referenceMinimax, referenceBestMoves
+
+
+class BitboardTest(unittest.TestCase):
+
+    def testPackedAsState(self):
+        rnd = random.Random(5)
+        for _ in range(50):
+            state, maximizingPlayer = randomTicTacToe(rnd)
+            board = state.packed()
+            self.assertEqual(state.packedEvaluate(board), state.evaluate())
+            moves = state.packedMoves(board, maximizingPlayer)
+            self.assertEqual([state.squareOfMove(move) for move in moves], state.possibleMoves())
+
+    def testMinimaxBitboardAsReference(self):
+        rnd = random.Random(6)
+        for _ in range(50):
+            state, maximizingPlayer = randomTicTacToe(rnd)
+            algo = GameAlgo.fromBitboardState(state)
+            for depth in (1, 3, 9):
+                result = algo.minimaxBitboard(state.packed(), depth, maximizingPlayer)
+                self.assertEqual(result.eval, referenceMinimax(algo, depth, maximizingPlayer))
+                if state.possibleMoves():
+                    self.assertIn(state.squareOfMove(result.bestMove),
+                                  referenceBestMoves(algo, depth, maximizingPlayer))
+                else:
+                    self.assertIsNone(result.bestMove)
+
+    def testLostPositionGivesAMove(self):
+        state = lostTicTacToe()
+        algo = GameAlgo.fromBitboardState(state)
+        result = algo.minimaxBitboard(state.packed(), 9, True)
+        self.assertEqual(result.eval, algo.MIN_EVAL)
+        self.assertIn(state.squareOfMove(result.bestMove), state.possibleMoves())
+
+    def testGameOverGivesNoMove(self):
+        state = ticTacToe((0, 1, 2), (4, 5))
+        algo = GameAlgo.fromBitboardState(state)
+        self.assertEqual(algo.minimaxBitboard(state.packed(), 9, False), (100, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import random
+import unittest
+
+from MinMaxAlgorithm.MinMaxAlgorithm import GameAlgo, MINMAXALPHABETAPRUNING_ALGO
+
+from tests.games import ticTacToe, lostTicTacToe, randomTicTacToe, referenceBestMoves
+
+try:
+    from MinMaxAlgorithm.MinMaxAlgorithmC import CGameAlgo
+except ImportError:
+    CGameAlgo = None
+
+
+@unittest.skipIf(CGameAlgo is None, "MinMaxAlgorithmC not built (needs Cython)")
+class CGameAlgoTest(unittest.TestCase):
+
+    def testBestMoveAsReference(self):
+        rnd = random.Random(1)
+        for _ in range(50):
+            state, maximizingPlayer = randomTicTacToe(rnd)
+            move = CGameAlgo(state).calculateMove(MINMAXALPHABETAPRUNING_ALGO, maximizingPlayer, 9)
+            if state.possibleMoves():
+                self.assertIn(move, referenceBestMoves(GameAlgo.fromBitboardState(state), 9, maximizingPlayer))
+            else:
+                self.assertIsNone(move)
+
+    def testLostPositionGivesAMove(self):
+        state = lostTicTacToe()
+        self.assertIn(CGameAlgo(state).calculateMove(MINMAXALPHABETAPRUNING_ALGO, True, 9), state.possibleMoves())
+
+    def testGameOverGivesNoMove(self):
+        state = ticTacToe((0, 1, 2), (4, 5))
+        self.assertIsNone(CGameAlgo(state).calculateMove(MINMAXALPHABETAPRUNING_ALGO, False, 9))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import sys
+import unittest
+
+from MinMaxAlgorithm.MinMaxAlgorithm import (MINMAX_ALGO, MINMAXALPHABETAPRUNING_ALGO,
+                                             MINMAXALPHABETAPRUNINGWITHHISTORY_ALGO,
+                                             KEY_EVAL, KEY_BESTMOVE, KEY_HISTORY, DEEP_SEARCH_DEPTH)
+
+from tests.games import CorridorGame, referenceMinimax
+
+
+# Deep enough that the recursive searches would run out of python stack
+LENGTH = 1500
+
+
+class DeepSearchTest(unittest.TestCase):
+
+    def setUp(self):
+        # The same game, short enough for the reference search
+        shortGame = CorridorGame(4)
+        self.expected = referenceMinimax(shortGame.algo(), 4, True)
+        self.recursionLimit = sys.getrecursionlimit()
+
+    def tearDown(self):
+        self.assertEqual(sys.getrecursionlimit(), self.recursionLimit)
+
+    def testAlphaBeta(self):
+        for kwargs in ({'moveOrderingHeuristics': True}, {}):
+            game = CorridorGame(LENGTH)
+            algo = game.algo(**kwargs)
+            self.assertEqual(algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, True, LENGTH), 0)
+            self.assertEqual(game.madeMoves, [])
+
+    def testMinimax(self):
+        game = CorridorGame(LENGTH)
+        algo = game.algo()
+        self.assertEqual(algo.calculateMove(MINMAX_ALGO, True, LENGTH), 0)
+        # minimax does not recur, so it also runs as deep on the stack it is called on
+        self.assertEqual(algo.minimax(LENGTH, True).eval, self.expected)
+
+    def testHistory(self):
+        game = CorridorGame(LENGTH)
+        algo = game.algo()
+        result = algo.calculateMoveWithHistory(MINMAXALPHABETAPRUNINGWITHHISTORY_ALGO, True, LENGTH)
+        self.assertEqual(result[KEY_EVAL], self.expected)
+        self.assertEqual(result[KEY_BESTMOVE], 0)
+        self.assertEqual(len(result[KEY_HISTORY]), LENGTH)
+        self.assertEqual(game.madeMoves, [])
+
+    def testErrorIsRaisedInCaller(self):
+        game = CorridorGame(LENGTH)
+
+        def evalFunc():
+            raise KeyError("from the eval")
+
+        algo = game.algo()
+        algo.evalFunc_callback = evalFunc
+        with self.assertRaises(KeyError):
+            algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, True, DEEP_SEARCH_DEPTH + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from MinMaxAlgorithm.MinMaxAlgorithm import MINMAXALPHABETAPRUNING_ALGO
+
+from tests.games import RandomTreeGame, referenceMinimax, referenceQuiescence, referenceBestMoves
+
+
+class CountingGame(RandomTreeGame):
+
+    """
+    RandomTreeGame with an evalDelta callback, and a count of the calls to evaluate.
+    """
+
+    def __init__(self, seed):
+        RandomTreeGame.__init__(self, seed)
+        self.evaluations = 0
+
+    def countedEvaluate(self):
+        self.evaluations += 1
+        return self.evaluate()
+
+    def evalDelta(self, move, maximizingPlayer):
+        # Called right after the move is made
+        afterMove = self.evaluate()
+        if maximizingPlayer:
+            self.maximizerUndoMove(move)
+            beforeMove = self.evaluate()
+            self.maximizerMove(move)
+        else:
+            self.minimizerUndoMove(move)
+            beforeMove = self.evaluate()
+            self.minimizerMove(move)
+        return afterMove - beforeMove
+
+
+def searchKwargs(game, setup):
+    if setup == 'heuristics':
+        return {'moveOrderingHeuristics': True}
+    if setup == 'quiescence':
+        return {'quiescenceMoves_callback': game.noisyMoves}
+    if setup == 'hashed':
+        return {'zobristHash_callback': game.hash}
+    return {}
+
+
+class EvalDeltaTest(unittest.TestCase):
+
+    def testAsReference(self):
+        for seed in range(8):
+            for setup in ('plain', 'heuristics', 'quiescence', 'hashed'):
+                game = CountingGame(seed)
+                algo = game.algo(game.countedEvaluate, evalDelta_callback=game.evalDelta,
+                                 **searchKwargs(game, setup))
+                for maximizingPlayer in (True, False):
+                    expected = referenceMinimax(algo, 5, maximizingPlayer)
+                    if setup == 'quiescence':
+                        expectedAlphaBeta = referenceQuiescence(game, 5, algo.quiescenceDepth, maximizingPlayer)
+                    else:
+                        expectedAlphaBeta = expected
+                    game.evaluations = 0
+                    self.assertEqual(algo.minimax(5, maximizingPlayer).eval, expected)
+                    self.assertEqual(algo.minMaxAlphaBetaPruning(5, maximizingPlayer, algo.MIN_EVAL, algo.MAX_EVAL).eval,
+                                     expectedAlphaBeta)
+                    # Only the root positions are evaluated, the rest comes from the deltas
+                    self.assertEqual(game.evaluations, 2)
+                    if setup != 'quiescence':
+                        self.assertIn(algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, maximizingPlayer, 5),
+                                      referenceBestMoves(algo, 5, maximizingPlayer))
+                    self.assertEqual(game.madeMoves, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from MinMaxAlgorithm.MinMaxAlgorithm import (GameAlgo, MINMAXALPHABETAPRUNINGWITHHISTORY_ALGO,
+                                             KEY_EVAL, KEY_BESTMOVE, KEY_HISTORY)
+
+from tests.games import (ticTacToe, lostTicTacToe, RandomTreeGame, InterruptAfter,
+                         referenceMinimax, referenceBestMoves)
+
+
+class HistoryTest(unittest.TestCase):
+
+    def replay(self, game, history, maximizingPlayer):
+        # Eval at the end of the line of moves, from where it started
+        for move in history:
+            if maximizingPlayer:
+                game.maximizerMove(move)
+            else:
+                game.minimizerMove(move)
+            maximizingPlayer = not maximizingPlayer
+        lineEval = game.evaluate()
+        for move in reversed(history):
+            maximizingPlayer = not maximizingPlayer
+            if maximizingPlayer:
+                game.maximizerUndoMove(move)
+            else:
+                game.minimizerUndoMove(move)
+        return lineEval
+
+    def testAsReference(self):
+        for seed in range(20):
+            game = RandomTreeGame(seed)
+            algo = game.algo()
+            for maximizingPlayer in (True, False):
+                result = algo.calculateMoveWithHistory(MINMAXALPHABETAPRUNINGWITHHISTORY_ALGO, maximizingPlayer, 5)
+                self.assertEqual(result[KEY_EVAL], referenceMinimax(algo, 5, maximizingPlayer))
+                self.assertIn(result[KEY_BESTMOVE], referenceBestMoves(algo, 5, maximizingPlayer))
+                # The history is the line that gives the eval, starting with the best move
+                self.assertEqual(result[KEY_HISTORY][0], result[KEY_BESTMOVE])
+                self.assertEqual(self.replay(game, result[KEY_HISTORY], maximizingPlayer), result[KEY_EVAL])
+                self.assertEqual(game.madeMoves, [])
+
+    def testLostPositionGivesAMove(self):
+        state = lostTicTacToe()
+        algo = GameAlgo.fromBitboardState(state)
+        result = algo.minMaxAlphaBetaPruningWithHistory(9, True, algo.MIN_EVAL, algo.MAX_EVAL)
+        self.assertEqual(result.eval, algo.MIN_EVAL)
+        self.assertIn(result.bestMove, state.possibleMoves())
+
+    def testGameOverGivesNoMove(self):
+        state = ticTacToe((0, 1, 2), (4, 5))
+        algo = GameAlgo.fromBitboardState(state)
+        self.assertEqual(algo.minMaxAlphaBetaPruningWithHistory(9, False, algo.MIN_EVAL, algo.MAX_EVAL),
+                         (100, None, ()))
+
+    def testInterruptGivesAMove(self):
+        game = RandomTreeGame(7)
+        evalFunc = InterruptAfter(game.evaluate, 1)
+        algo = game.algo(evalFunc)
+        evalFunc.algo = algo
+        # Interrupted before a search starts, the first move is given
+        algo.interruptAnalyze()
+        result = algo.minMaxAlphaBetaPruningWithHistory(5, True, algo.MIN_EVAL, algo.MAX_EVAL)
+        self.assertEqual(result.bestMove, game.possibleMoves()[0])
+        for calls in (1, 5, 50):
+            evalFunc.calls = calls
+            algo.interruptFlag = False
+            result = algo.minMaxAlphaBetaPruningWithHistory(5, True, algo.MIN_EVAL, algo.MAX_EVAL)
+            self.assertIn(result.bestMove, game.possibleMoves())
+            self.assertEqual(game.madeMoves, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+import logging
+import unittest
+
+from MinMaxAlgorithm.MinMaxAlgorithm import (GameAlgo, MINMAX_ALGO, MINMAXALPHABETAPRUNING_ALGO,
+                                             MINMAX_ALGO_WITH_LOGGING, MAXIMIZER_SIDE, MINIMIZER_SIDE,
+                                             DEEP_SEARCH_DEPTH)
+
+from tests.games import (ticTacToe, lostTicTacToe, RandomTreeGame, InterruptAfter,
+                         referenceMinimax, referenceBestMoves)
+
+
+class FixedMoveAlgo(GameAlgo):
+
+    """
+    GameAlgo whose alpha-beta move is always the same.
+    """
+
+    __slots__ = ()
+
+    def alphaBetaMove(self, maximizingPlayer, depth):
+        return 'fixed'
+
+
+def interiorNodes(game, depth, maximizingPlayer):
+    # Number of nodes above depth 0 in a search with no pruning: the ones that need a move list
+    if depth == 0:
+        return 0
+    count = 1
+    for move in game.possibleMoves():
+        if maximizingPlayer:
+            game.maximizerMove(move)
+        else:
+            game.minimizerMove(move)
+        count += interiorNodes(game, depth - 1, not maximizingPlayer)
+        if maximizingPlayer:
+            game.maximizerUndoMove(move)
+        else:
+            game.minimizerUndoMove(move)
+    return count
+
+
+class MinimaxTest(unittest.TestCase):
+
+    def testEvalAsReference(self):
+        for seed in range(20):
+            game = RandomTreeGame(seed)
+            algo = game.algo()
+            for maximizingPlayer in (True, False):
+                expected = referenceMinimax(algo, 5, maximizingPlayer)
+                self.assertEqual(algo.minimax(5, maximizingPlayer).eval, expected)
+                self.assertEqual(algo.minimax(5, maximizingPlayer, algo.MIN_EVAL, algo.MAX_EVAL).eval, expected)
+                self.assertEqual(algo.minimaxWithLogging(5, maximizingPlayer).eval, expected)
+                self.assertEqual(game.madeMoves, [])
+
+    def testBestMoveAsReference(self):
+        for seed in range(20):
+            game = RandomTreeGame(seed)
+            algo = game.algo()
+            for maximizingPlayer in (True, False):
+                bestMoves = referenceBestMoves(algo, 5, maximizingPlayer)
+                for whichAlgo in (MINMAX_ALGO, MINMAXALPHABETAPRUNING_ALGO, MINMAX_ALGO_WITH_LOGGING):
+                    self.assertIn(algo.calculateMove(whichAlgo, maximizingPlayer, 5), bestMoves)
+
+    def testNoMoveListsAtDepthZero(self):
+        for seed in range(10):
+            game = RandomTreeGame(seed)
+            moveCalls = []
+
+            def possibleMoves():
+                moveCalls.append(game.key)
+                return game.possibleMoves()
+
+            algo = GameAlgo(game.evaluate, game.maximizerMove, game.minimizerMove,
+                            game.maximizerUndoMove, game.minimizerUndoMove, possibleMoves, possibleMoves)
+            for depth in (0, 1, 4):
+                expectedCalls = interiorNodes(game, depth, True)
+                for search in (algo.minimax, algo.minimaxWithLogging):
+                    del moveCalls[:]
+                    search(depth, True)
+                    self.assertEqual(len(moveCalls), expectedCalls)
+            # The searches with pruning visit fewer nodes, but none of them needs a move list at depth 0
+            algo.minMaxAlphaBetaPruning(0, True, algo.MIN_EVAL, algo.MAX_EVAL)
+            algo.minMaxAlphaBetaPruningWithHistory(0, True, algo.MIN_EVAL, algo.MAX_EVAL)
+            self.assertEqual(len(moveCalls), expectedCalls)
+
+    def testLogging(self):
+        # The module turns all logging off. Turned on, every node is logged.
+        logging.disable(logging.NOTSET)
+        self.addCleanup(logging.disable, logging.CRITICAL)
+        game = RandomTreeGame(4)
+        evaluations = []
+
+        def evaluate():
+            evaluations.append(game.key)
+            return game.evaluate()
+
+        algo = game.algo(evaluate)
+        for maximizingPlayer in (True, False):
+            side = "(MAX)" if maximizingPlayer else "(MIN)"
+            bestMoves = referenceBestMoves(algo, algo.DEPTH, maximizingPlayer)
+            del evaluations[:]
+            with self.assertLogs(level=logging.INFO) as logs:
+                result = algo.minimaxWithLogging(algo.DEPTH, maximizingPlayer)
+            self.assertIn(result.bestMove, bestMoves)
+            messages = [record.getMessage() for record in logs.records]
+            self.assertEqual(messages[0], side + "ROOT")
+            self.assertEqual(messages[-1], side + "ROOT *BEST MOVE:" + str(result.bestMove))
+            bottomLines = [message for message in messages if "***BOTTOM***" in message]
+            self.assertEqual(len(bottomLines), len(evaluations))
+            # Nodes are named by the moves to them, and indented by how deep they are
+            otherSide = "(MIN)" if maximizingPlayer else "(MAX)"
+            childNode = "---" + otherSide + "ROOT/" + str(result.bestMove)
+            self.assertTrue(any(message == childNode or message.startswith(childNode + " ")
+                                for message in messages))
+
+    def testMoveBuffersAsReference(self):
+        for seed in range(20):
+            game = RandomTreeGame(seed)
+            algo = game.algo(writePossibleMovesAsMaximizer_callback=game.writePossibleMoves,
+                             writePossibleMovesAsMinimizer_callback=game.writePossibleMoves)
+            for maximizingPlayer in (True, False):
+                expected = referenceMinimax(algo, 5, maximizingPlayer)
+                self.assertEqual(algo.minimax(5, maximizingPlayer).eval, expected)
+                self.assertEqual(algo.minimax(5, maximizingPlayer, algo.MIN_EVAL, algo.MAX_EVAL).eval, expected)
+
+    def testMoveBuffersNeedBothCallbacks(self):
+        game = RandomTreeGame()
+        with self.assertRaises(ValueError):
+            game.algo(writePossibleMovesAsMaximizer_callback=game.writePossibleMoves)
+        with self.assertRaises(ValueError):
+            game.algo(writePossibleMovesAsMinimizer_callback=game.writePossibleMoves)
+
+    def testFromSideCallbacks(self):
+        # One callback per action, with the side first, plays the same game
+        for seed in range(10):
+            game = RandomTreeGame(seed)
+
+            def move(side, move):
+                if side == MAXIMIZER_SIDE:
+                    game.maximizerMove(move)
+                else:
+                    game.minimizerMove(move)
+
+            def undoMove(side, move):
+                if side == MAXIMIZER_SIDE:
+                    game.maximizerUndoMove(move)
+                else:
+                    game.minimizerUndoMove(move)
+
+            def possibleMoves(side):
+                self.assertIn(side, (MAXIMIZER_SIDE, MINIMIZER_SIDE))
+                return game.possibleMoves()
+
+            algo = GameAlgo.fromSideCallbacks(game.evaluate, move, undoMove, possibleMoves)
+            for maximizingPlayer in (True, False):
+                self.assertEqual(algo.minimax(5, maximizingPlayer).eval,
+                                 referenceMinimax(game.algo(), 5, maximizingPlayer))
+                self.assertIn(algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, maximizingPlayer, 5),
+                              referenceBestMoves(game.algo(), 5, maximizingPlayer))
+
+    def testOverriddenAlgoMove(self):
+        # calculateMove runs the method of the subclass, also on the deep search stack
+        algo = FixedMoveAlgo.fromBitboardState(ticTacToe())
+        self.assertEqual(algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, True, 9), 'fixed')
+        self.assertEqual(algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, True, DEEP_SEARCH_DEPTH + 1), 'fixed')
+        self.assertIn(algo.calculateMove(MINMAX_ALGO, True, 1), range(9))
+
+    def testTicTacToe(self):
+        # X to move, and must take square 2 or O wins
+        state = ticTacToe((0, 4), (8, 1))
+        algo = GameAlgo.fromBitboardState(state, depth=9)
+        for whichAlgo in (MINMAX_ALGO, MINMAXALPHABETAPRUNING_ALGO):
+            self.assertIn(algo.calculateMove(whichAlgo, True, 9), referenceBestMoves(algo, 9, True))
+
+    def testLostPositionGivesAMove(self):
+        # Every move loses with the lowest eval there is. A move must still be given.
+        for whichAlgo in (MINMAX_ALGO, MINMAXALPHABETAPRUNING_ALGO):
+            for kwargs in ({}, {'zobristHash_callback': None},
+                           {'writePossibleMovesAsMaximizer_callback': None,
+                            'writePossibleMovesAsMinimizer_callback': None}):
+                state = lostTicTacToe()
+                algo = GameAlgo.fromBitboardState(state, **kwargs)
+                self.assertIn(algo.calculateMove(whichAlgo, True, 9), state.possibleMoves())
+                self.assertEqual(algo.minimax(9, True).eval, algo.MIN_EVAL)
+
+    def testGameOverGivesNoMove(self):
+        state = ticTacToe((0, 1, 2), (4, 5))
+        algo = GameAlgo.fromBitboardState(state)
+        for whichAlgo in (MINMAX_ALGO, MINMAXALPHABETAPRUNING_ALGO):
+            self.assertIsNone(algo.calculateMove(whichAlgo, False, 9))
+        self.assertEqual(algo.minimax(9, False), (100, None))
+
+    def testInterruptGivesAMove(self):
+        for calls in (1, 5, 50):
+            game = RandomTreeGame(3)
+            evalFunc = InterruptAfter(game.evaluate, calls)
+            algo = game.algo(evalFunc)
+            evalFunc.algo = algo
+            move = algo.minimax(5, True, algo.MIN_EVAL, algo.MAX_EVAL).bestMove
+            self.assertIn(move, game.possibleMoves())
+            self.assertEqual(game.madeMoves, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
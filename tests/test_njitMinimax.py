@@ -0,0 +1,122 @@
+import random
+import unittest
+
+from MinMaxAlgorithm.MinMaxAlgorithm import GameAlgo
+from MinMaxAlgorithm.MinMaxAlgorithmNumba import NjitMinimax, np, njit
+
+from tests.games import randomTicTacToe, lostTicTacToe, ticTacToe, referenceMinimax, referenceBestMoves
+
+
+# Tic-Tac-Toe on a numpy board of 9 int8: 0 free, 1 maximizer, 2 minimizer
+WIN_LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6))
+
+
+def jit(func):
+    return func if njit is None else njit(func)
+
+
+@jit
+def evalBoard(board):
+    for a, b, c in WIN_LINES:
+        if board[a] != 0 and board[a] == board[b] and board[a] == board[c]:
+            return 100 if board[a] == 1 else -100
+    return 0
+
+
+@jit
+def writeMoves(board, maximizingPlayer, moveBuffer):
+    if evalBoard(board) != 0:
+        return 0
+    count = 0
+    for square in range(9):
+        if board[square] == 0:
+            moveBuffer[count] = square
+            count += 1
+    return count
+
+
+@jit
+def makeMove(board, move, maximizingPlayer):
+    board[move] = 1 if maximizingPlayer else 2
+
+
+@jit
+def undoMove(board, move, maximizingPlayer):
+    board[move] = 0
+
+
+CALLBACKS = (evalBoard, writeMoves, makeMove, undoMove)
+
+
+def numpyBoard(state):
+    board = np.zeros(9, np.int8)
+    for square in range(9):
+        if state.maximizerBoard >> square & 1:
+            board[square] = 1
+        elif state.minimizerBoard >> square & 1:
+            board[square] = 2
+    return board
+
+
+def referenceAlgo(board):
+    # A GameAlgo for the reference search, with python callbacks on the same board
+    callbacks = [getattr(func, 'py_func', func) for func in CALLBACKS]
+    evalFunc, movesFunc, moveFunc, undoFunc = callbacks
+    moveBuffer = np.empty(9, np.int32)
+
+    def moves(maximizingPlayer):
+        return [int(move) for move in moveBuffer[:movesFunc(board, maximizingPlayer, moveBuffer)]]
+
+    return GameAlgo(lambda: evalFunc(board),
+                    lambda move: moveFunc(board, move, True), lambda move: moveFunc(board, move, False),
+                    lambda move: undoFunc(board, move, True), lambda move: undoFunc(board, move, False),
+                    lambda: moves(True), lambda: moves(False))
+
+
+@unittest.skipIf(np is None, "needs numpy")
+class NjitMinimaxTest(unittest.TestCase):
+
+    def njitMinimaxes(self):
+        # Compiled if numba is installed, and then also the same search run as python
+        yield NjitMinimax(*CALLBACKS, maxMoves=9, maxDepth=9)
+        if njit is not None:
+            yield NjitMinimax(*[func.py_func for func in CALLBACKS], maxMoves=9, maxDepth=9)
+
+    def testAsReference(self):
+        rnd = random.Random(2)
+        positions = [randomTicTacToe(rnd) for _ in range(30)]
+        for njitMinimax in self.njitMinimaxes():
+            for state, maximizingPlayer in positions:
+                board = numpyBoard(state)
+                reference = referenceAlgo(board)
+                algo = GameAlgo(None, None, None, None, None, None, None, njitMinimax=njitMinimax)
+                for depth in (1, 3, 9):
+                    result = algo.minimaxNjit(board, depth, maximizingPlayer)
+                    self.assertIs(type(result.eval), float)
+                    self.assertEqual(result.eval, referenceMinimax(reference, depth, maximizingPlayer))
+                    if result.bestMove is not None:
+                        self.assertIn(result.bestMove, referenceBestMoves(reference, depth, maximizingPlayer))
+                    self.assertTrue(np.array_equal(board, numpyBoard(state)))
+
+    def testLostPositionGivesAMove(self):
+        state = lostTicTacToe()
+        for njitMinimax in self.njitMinimaxes():
+            algo = GameAlgo(None, None, None, None, None, None, None, njitMinimax=njitMinimax)
+            result = algo.minimaxNjit(numpyBoard(state), 9, True)
+            self.assertEqual(result.eval, -100)
+            self.assertIn(result.bestMove, state.possibleMoves())
+
+    def testGameOverGivesNoMove(self):
+        state = ticTacToe((0, 1, 2), (4, 5))
+        for njitMinimax in self.njitMinimaxes():
+            algo = GameAlgo(None, None, None, None, None, None, None, njitMinimax=njitMinimax)
+            self.assertEqual(algo.minimaxNjit(numpyBoard(state), 9, False), (100, None))
+
+    def testTooDeep(self):
+        for njitMinimax in self.njitMinimaxes():
+            with self.assertRaises(ValueError):
+                njitMinimax(numpyBoard(ticTacToe()), 10, True, -100, 100, -100, 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import random
+import unittest
+
+from MinMaxAlgorithm.MinMaxAlgorithm import GameAlgo, MINMAXALPHABETAPRUNING_ALGO
+
+from tests.games import randomTicTacToe, RandomTreeGame, referenceMinimax, referenceBestMoves
+
+
+class NullMoves:
+
+    """
+    Null move callbacks that count the null moves, and how many are not
+    taken back yet.
+    """
+
+    def __init__(self):
+        self.open = 0
+        self.count = 0
+
+    def nullMove(self):
+        self.open += 1
+        self.count += 1
+
+    def undoNullMove(self):
+        assert self.open > 0
+        self.open -= 1
+
+
+class NullMoveTest(unittest.TestCase):
+
+    def testTicTacToe(self):
+        # Another token never makes a Tic-Tac-Toe position worse, so null-move
+        # pruning gives the same result as the full search.
+        rnd = random.Random(3)
+        nullMoves = NullMoves()
+        for _ in range(30):
+            state, maximizingPlayer = randomTicTacToe(rnd)
+            if not state.possibleMoves():
+                continue
+            for hashed in (False, True):
+                algo = GameAlgo.fromBitboardState(state, nullMove_callback=nullMoves.nullMove,
+                                                  undoNullMove_callback=nullMoves.undoNullMove,
+                                                  zobristHash_callback=state.hash if hashed else None)
+                self.assertEqual(algo.minMaxAlphaBetaPruning(9, maximizingPlayer, algo.MIN_EVAL, algo.MAX_EVAL).eval,
+                                 referenceMinimax(algo, 9, maximizingPlayer))
+                self.assertIn(algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, maximizingPlayer, 9),
+                              referenceBestMoves(algo, 9, maximizingPlayer))
+                self.assertEqual(nullMoves.open, 0)
+        self.assertGreater(nullMoves.count, 0)
+
+    def testNotAllowed(self):
+        # Where nullMoveAllowed_callback says no, there is no null move and nothing changes
+        nullMoves = NullMoves()
+        for seed in range(10):
+            game = RandomTreeGame(seed)
+            algo = game.algo(nullMove_callback=nullMoves.nullMove, undoNullMove_callback=nullMoves.undoNullMove,
+                             nullMoveAllowed_callback=lambda: False, zobristHash_callback=game.hash)
+            for maximizingPlayer in (True, False):
+                self.assertEqual(algo.minMaxAlphaBetaPruning(5, maximizingPlayer, algo.MIN_EVAL, algo.MAX_EVAL).eval,
+                                 referenceMinimax(algo, 5, maximizingPlayer))
+        self.assertEqual(nullMoves.count, 0)
+
+    def testNotAtRoot(self):
+        # Too shallow for a null move below the root, and never at the root itself
+        nullMoves = NullMoves()
+        game = RandomTreeGame()
+        algo = game.algo(nullMove_callback=nullMoves.nullMove, undoNullMove_callback=nullMoves.undoNullMove)
+        algo.minMaxAlphaBetaPruning(3, True, algo.MIN_EVAL, algo.MAX_EVAL)
+        self.assertEqual(nullMoves.count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+from MinMaxAlgorithm.MinMaxAlgorithm import MINMAXALPHABETAPRUNING_ALGO, TT_EXACT, TT_LOWERBOUND
+from MinMaxAlgorithm.NumpyTranspositionTable import NumpyTranspositionTable, np
+
+from tests.games import RandomTreeGame, referenceMinimax, referenceBestMoves
+
+
+@unittest.skipIf(np is None, "needs numpy")
+class NumpyTranspositionTableTest(unittest.TestCase):
+
+    def testStoreAndProbe(self):
+        table = NumpyTranspositionTable(64)
+        table.store(12345, 3, TT_EXACT, -17, 4)
+        table.store(67890, 2, TT_LOWERBOUND, 5, None)
+        self.assertEqual(table.probe(12345), (12345, 3, TT_EXACT, -17, 4, 0))
+        self.assertEqual(table.probe(67890), (67890, 2, TT_LOWERBOUND, 5, None, 0))
+        self.assertIsNone(table.probe(1))
+        table.clear()
+        self.assertIsNone(table.probe(12345))
+
+    def testAnyInt16Move(self):
+        # Also -1 and 0, which must not be taken for "no best move"
+        table = NumpyTranspositionTable(64)
+        for key, bestMove in enumerate((-1, 0, -(1 << 15), (1 << 15) - 1), 1):
+            table.store(key, 2, TT_LOWERBOUND, 7, bestMove)
+            self.assertEqual(table.probe(key), (key, 2, TT_LOWERBOUND, 7, bestMove, 0))
+
+    def testRejectsWhatDoesNotFit(self):
+        table = NumpyTranspositionTable(64)
+        for evaluation, bestMove, depth in ((1.5, 3, 2), (40000, 3, 2), (1, (1, 2), 2),
+                                            (1, 40000, 2), (1, 2.5, 2), (1, 3, 200)):
+            with self.assertRaises(ValueError):
+                table.store(1, depth, TT_EXACT, evaluation, bestMove)
+        self.assertIsNone(table.probe(1))
+
+    def testRejectsPreferFasterWin(self):
+        game = RandomTreeGame()
+        with self.assertRaises(ValueError):
+            game.algo(zobristHash_callback=game.hash, preferFasterWin=True,
+                      transpositionTable=NumpyTranspositionTable(1024))
+
+    def testSearchAsReference(self):
+        for seed in range(10):
+            game = RandomTreeGame(seed)
+            algo = game.algo(zobristHash_callback=game.hash,
+                             transpositionTable=NumpyTranspositionTable(1024))
+            for maximizingPlayer in (True, False):
+                bestMoves = referenceBestMoves(algo, 5, maximizingPlayer)
+                self.assertIn(algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, maximizingPlayer, 5), bestMoves)
+                self.assertEqual(algo.minMaxAlphaBetaPruning(5, maximizingPlayer, algo.MIN_EVAL, algo.MAX_EVAL).eval,
+                                 referenceMinimax(algo, 5, maximizingPlayer))
+
+
+if __name__ == '__main__':
+    unittest.main()
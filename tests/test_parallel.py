@@ -0,0 +1,85 @@
+import threading
+import time
+import unittest
+
+from MinMaxAlgorithm.MinMaxAlgorithm import GameAlgo, MINMAX_ALGO, MINMAXALPHABETAPRUNING_ALGO, MINMAX_ALGO_WITH_LOGGING
+
+from tests.games import lostTicTacToe, RandomTreeGame, referenceBestMoves
+
+
+class QuickFirstMoveGame(RandomTreeGame):
+
+    """
+    RandomTreeGame where the first move at the start ends the game. The
+    search of it, done before the workers start, is over at once.
+    """
+
+    def __init__(self, *args, **kwargs):
+        RandomTreeGame.__init__(self, *args, **kwargs)
+        self.quickMove = RandomTreeGame.possibleMoves(self)[0]
+
+    def possibleMoves(self):
+        if self.madeMoves == [self.quickMove]:
+            return []
+        return RandomTreeGame.possibleMoves(self)
+
+
+class ParallelTest(unittest.TestCase):
+
+    def testBestMoveAsReference(self):
+        for seed in range(6):
+            for hashed in (False, True):
+                game = RandomTreeGame(seed, moveCount=10, branching=6)
+                algo = game.algo(zobristHash_callback=game.hash if hashed else None)
+                try:
+                    for maximizingPlayer in (True, False):
+                        bestMoves = referenceBestMoves(algo, 4, maximizingPlayer)
+                        for whichAlgo in (MINMAX_ALGO, MINMAXALPHABETAPRUNING_ALGO):
+                            # The worker processes are kept from one call to the next
+                            move = algo.calculateMoveParallel(whichAlgo, maximizingPlayer, 4, workers=2)
+                            self.assertIn(move, bestMoves)
+                            self.assertEqual(game.madeMoves, [])
+                finally:
+                    algo.closeProcessPool()
+
+    def testInterruptStopsTheWorkers(self):
+        # Uninterrupted, the search to depth 12 takes far longer than this test
+        game = QuickFirstMoveGame(1, moveCount=12, branching=8)
+        algo = game.algo()
+        try:
+            for _ in range(2):
+                startTime = time.time()
+                threading.Timer(0.3, algo.interruptAnalyze).start()
+                move = algo.calculateMoveParallel(MINMAX_ALGO, True, 12, workers=2)
+                self.assertLess(time.time() - startTime, 5)
+                self.assertIn(move, game.possibleMoves())
+                self.assertEqual(game.madeMoves, [])
+            # The next search is not interrupted
+            self.assertIn(algo.calculateMoveParallel(MINMAX_ALGO, True, 4, workers=2),
+                          referenceBestMoves(algo, 4, True))
+        finally:
+            algo.closeProcessPool()
+
+    def testAlgosAsCalculateMove(self):
+        # Unknown algos are searched with minimax to the depth given when created
+        game = RandomTreeGame(2, moveCount=10, branching=6)
+        algo = game.algo(depth=4)
+        try:
+            self.assertIn(algo.calculateMoveParallel(0, True, 2, workers=2), referenceBestMoves(algo, 4, True))
+            self.assertIn(algo.calculateMoveParallel(MINMAX_ALGO_WITH_LOGGING, True, 3, workers=2),
+                          referenceBestMoves(algo, 3, True))
+        finally:
+            algo.closeProcessPool()
+
+    def testLostPositionGivesAMove(self):
+        state = lostTicTacToe()
+        algo = GameAlgo.fromBitboardState(state)
+        try:
+            self.assertIn(algo.calculateMoveParallel(MINMAXALPHABETAPRUNING_ALGO, True, 9, workers=3),
+                          state.possibleMoves())
+        finally:
+            algo.closeProcessPool()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from MinMaxAlgorithm.MinMaxAlgorithm import MINMAXALPHABETAPRUNING_ALGO
+
+from tests.games import RandomTreeGame, referenceQuiescence
+
+
+class QuiescenceTest(unittest.TestCase):
+
+    def testAsReference(self):
+        for seed in range(15):
+            for quiescenceDepth in (0, 1, 3):
+                for hashed in (False, True):
+                    game = RandomTreeGame(seed)
+                    algo = game.algo(quiescenceMoves_callback=game.noisyMoves, quiescenceDepth=quiescenceDepth,
+                                     zobristHash_callback=game.hash if hashed else None)
+                    for maximizingPlayer in (True, False):
+                        expected = referenceQuiescence(game, 3, quiescenceDepth, maximizingPlayer)
+                        result = algo.minMaxAlphaBetaPruning(3, maximizingPlayer, algo.MIN_EVAL, algo.MAX_EVAL)
+                        self.assertEqual(result.eval, expected)
+                        self.assertEqual(game.madeMoves, [])
+
+    def testCalculateMove(self):
+        # The eval of the move given is the best there is
+        for seed in range(15):
+            game = RandomTreeGame(seed)
+            algo = game.algo(quiescenceMoves_callback=game.noisyMoves)
+            move = algo.calculateMove(MINMAXALPHABETAPRUNING_ALGO, True, 3)
+            moveEvals = {}
+            for candidate in game.possibleMoves():
+                game.maximizerMove(candidate)
+                moveEvals[candidate] = referenceQuiescence(game, 2, algo.quiescenceDepth, False)
+                game.maximizerUndoMove(candidate)
+            self.assertEqual(moveEvals[move], max(moveEvals.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()